@@ -0,0 +1,82 @@
+"""Board geometry and cell styles, built once for the configured GRID_SIZE.
+
+The renderers only look values up from here while drawing a frame, so a
+tick assigns shared objects instead of building new ones. The style bundles
+are read-only mappings shared by every cell: never modify them or the
+objects they hold.
+"""
+from types import MappingProxyType
+
+from flet import Colors, Paint, PaintingStyle
+
+from assets.styles.styles import *
+
+CELL_STEP = CELL_SIZE + CELL_SPACING
+CELL_OFFSETS = tuple(i * CELL_STEP for i in range(GRID_SIZE))  # Pixel offset of each row and column
+BOARD_EXTENT = GRID_SIZE * CELL_STEP - CELL_SPACING
+
+# Special food fades out in this many opacity steps
+OPACITY_STEPS = 20
+MIN_SPECIAL_FOOD_OPACITY = 0.3
+
+
+def opacity_step(opacity):
+    """Index into the special food styles for an opacity between 0 and 1"""
+    return round(max(MIN_SPECIAL_FOOD_OPACITY, min(opacity, 1)) * OPACITY_STEPS)
+
+
+def _bundle(**properties):
+    return MappingProxyType(properties)
+
+
+# Container properties for the stack renderer
+HEAD_STYLE = _bundle(
+    bgcolor=SNAKE_COLORS["head"],
+    border=SNAKE_HEAD_BORDER,
+    animate=SNAKE_HEAD_ANIMATION,
+)
+BODY_STYLE = _bundle(
+    bgcolor=SNAKE_COLORS["body"],
+    border=SNAKE_BODY_BORDER,
+    animate=SNAKE_BODY_ANIMATION,
+)
+FOOD_STYLE = _bundle(
+    bgcolor=FOOD_COLOR,
+    border=FOOD_BORDER,
+    opacity=1,
+)
+SPECIAL_FOOD_STYLES = tuple(
+    _bundle(
+        bgcolor=SPECIAL_FOOD_COLOR,
+        border=SPECIAL_FOOD_BORDER,
+        opacity=step / OPACITY_STEPS,
+    )
+    for step in range(OPACITY_STEPS + 1)
+)
+
+# Viewport cells show whatever is in their world cell, so these bundles all
+# set the same properties
+EMPTY_CELL_STYLE = _bundle(bgcolor=BOARD_COLOR, border=None, opacity=1)
+HEAD_CELL_STYLE = _bundle(bgcolor=SNAKE_COLORS["head"], border=SNAKE_HEAD_BORDER, opacity=1)
+BODY_CELL_STYLE = _bundle(bgcolor=SNAKE_COLORS["body"], border=SNAKE_BODY_BORDER, opacity=1)
+
+
+def _fill(color):
+    return Paint(color=color, style=PaintingStyle.FILL)
+
+
+def _stroke(color):
+    return Paint(color=color, stroke_width=2, style=PaintingStyle.STROKE)
+
+
+# (fill, outline) paints for the canvas renderer
+HEAD_PAINTS = (_fill(SNAKE_COLORS["head"]), _stroke(SNAKE_COLORS["head_outline"]))
+BODY_PAINTS = (_fill(SNAKE_COLORS["body"]), _stroke(SNAKE_COLORS["body_outline"]))
+FOOD_PAINTS = (_fill(FOOD_COLOR), _stroke(FOOD_OUTLINE_COLOR))
+SPECIAL_FOOD_STROKE = _stroke(SPECIAL_FOOD_OUTLINE_COLOR)
+SPECIAL_FOOD_PAINTS = tuple(
+    (_fill(Colors.with_opacity(step / OPACITY_STEPS, SPECIAL_FOOD_COLOR)), SPECIAL_FOOD_STROKE)
+    for step in range(OPACITY_STEPS + 1)
+)
+BOARD_PAINT = _fill(BOARD_COLOR)
+GAP_PAINT = Paint(color=BACKGROUND_COLOR, stroke_width=CELL_SPACING, style=PaintingStyle.STROKE)
@@ -1,3 +1,4 @@
+import os
 from flet import (
     Colors,
     LinearGradient,
@@ -32,7 +33,10 @@ CONTROLS_COLOR = Colors.BLUE_GREY_600
 KEY_COLOR = Colors.BLUE_GREY_800
 
 # Dimensions
-GRID_SIZE = 20  # Number of cells in each direction
+GRID_SIZE = int(os.environ.get("SNAKE_GRID_SIZE", 20))  # Number of cells in each direction
+# Cells in each direction of the world; when larger than GRID_SIZE the board
+# is a GRID_SIZE x GRID_SIZE camera view that follows the snake's head
+WORLD_SIZE = max(GRID_SIZE, int(os.environ.get("SNAKE_WORLD_SIZE", GRID_SIZE)))
 BOARD_SIZE = 500  # Fixed board size in pixels
 BOARD_PADDING = 10  # Padding inside the board
 CELL_SPACING = 2  # Space between cells
@@ -42,11 +46,17 @@ PLAYABLE_SIZE = BOARD_SIZE - (2 * BOARD_PADDING)  # Size minus padding
 TOTAL_SPACING = CELL_SPACING * (GRID_SIZE - 1)  # Total space used by spacing
 CELL_SIZE = (PLAYABLE_SIZE - TOTAL_SPACING) // GRID_SIZE  # Cell size that fits perfectly
 
+# Board renderer: "stack" (one Container per cell) or "canvas" (flet.canvas shapes)
+RENDERER = os.environ.get("SNAKE_RENDERER", "stack")
+
 # Game settings
 DEFAULT_SPEED = 0.08  # Default speed
 MAX_SPEED = 0.02  # Fastest speed (lower number = faster)
 MIN_SPEED = 0.2  # Slowest speed
 SPEED_INCREASE = 0.995  # Speed increase factor
+AUTOSAVE_INTERVAL = 5  # Game seconds between autosaves
+HUD_REFRESH_INTERVAL = 0.25  # Seconds between performance HUD refreshes
+METRICS_INTERVAL = 5  # Seconds between SNAKE_METRICS file writes
 
 # Animation settings
 MOVE_DURATION = 150  # Movement animation duration in milliseconds
@@ -64,6 +74,7 @@ SHADOW = 5
 SNAKE_HEAD_BORDER = border.all(2, SNAKE_COLORS["head_outline"])
 SNAKE_BODY_BORDER = border.all(2, SNAKE_COLORS["body_outline"])
 FOOD_BORDER = border.all(2, FOOD_OUTLINE_COLOR)
+SPECIAL_FOOD_BORDER = border.all(2, SPECIAL_FOOD_OUTLINE_COLOR)
 
 # Text styles
 TITLE_STYLE = {
@@ -144,3 +155,18 @@ SCORE_ITEM_STYLE = {
     "color": CONTROLS_COLOR,
     "weight": "w400",
 }
+
+# Performance HUD
+HUD_TEXT_STYLE = {
+    "size": 11,
+    "color": Colors.WHITE,
+    "font_family": "monospace",
+}
+
+HUD_CONTAINER_STYLE = {
+    "bgcolor": Colors.with_opacity(0.7, Colors.BLUE_GREY_900),
+    "padding": 6,
+    "border_radius": 4,
+    "left": 8,
+    "top": 8,
+}
@@ -0,0 +1,182 @@
+"""Benchmarks for one grid size.
+
+GRID_SIZE is read from SNAKE_GRID_SIZE when the styles are imported, so
+every grid size runs in its own process; use benchmarks/run.py to sweep.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+
+from benchmarks.common import allocated, cycle_cell, cycle_direction, make_page, peak_memory, place_snake, timed
+
+
+def bench_engine_step(grid_size, length, ticks):
+    from game.engine import SnakeEngine
+
+    engine = SnakeEngine(grid_size, seed=1, special_food_chance=0)
+    k = place_snake(engine, length)
+
+    def tick():
+        nonlocal k
+        engine.step(cycle_direction(k, grid_size))
+        k += 1
+
+    return {"ticks_per_sec": timed(tick, ticks)}
+
+
+def bench_collision(grid_size, length, checks):
+    from game.engine import SnakeEngine
+
+    engine = SnakeEngine(grid_size, seed=1)
+    place_snake(engine, length)
+    rng = random.Random(1)
+    cells = [(rng.randrange(grid_size), rng.randrange(grid_size)) for _ in range(1024)]
+    i = 0
+
+    def check():
+        nonlocal i
+        engine.is_occupied(cells[i & 1023])
+        i += 1
+
+    return {"checks_per_sec": timed(check, checks)}
+
+
+def bench_spawn_food(grid_size, length, spawns):
+    from game.engine import SnakeEngine
+
+    engine = SnakeEngine(grid_size, seed=1, special_food_chance=0)
+    place_snake(engine, length)
+    return {"spawns_per_sec": timed(engine.spawn_food, spawns)}
+
+
+async def bench_render(grid_size, length, ticks):
+    """Full game ticks (engine step, renderer diff, batched page.update) on a headless page"""
+    import main
+
+    page = make_page()
+    conn = page._Page__conn
+    game = main.SnakeGame(page, autosave=False)
+    k = place_snake(game.engine, length)
+    game.renderer.reset(game.engine.snake)
+    game.render()
+
+    def tick():
+        nonlocal k
+        game.inputs.push(cycle_direction(k, grid_size), game.engine.direction)
+        game.update(game.speed)
+        game.render()
+        k += 1
+
+    round_trips, added, sent = conn.counters()
+    ticks_per_sec = timed(tick, ticks)
+    round_trips2, added2, sent2 = conn.counters()
+    return {
+        "initial_bytes": sent,
+        "initial_controls": added,
+        "ticks_per_sec": ticks_per_sec,
+        "round_trips_per_tick": (round_trips2 - round_trips) / ticks,
+        "controls_created_per_tick": (added2 - added) / ticks,
+        "patch_bytes_per_tick": (sent2 - sent) / ticks,
+        "peak_memory_bytes": peak_memory(tick, min(ticks, 200)),
+        "snake_length": len(game.engine.snake),
+    }
+
+
+async def bench_alloc(grid_size, length, ticks):
+    """tracemalloc bytes per tick: a whole game tick, and the board renderer alone (no page.update)"""
+    import main
+
+    game = main.SnakeGame(make_page(), autosave=False)
+    game.recorder = None  # Replay writes are not part of a frame
+    k = place_snake(game.engine, length)
+    game.renderer.reset(game.engine.snake)
+    game.render()
+
+    def tick():
+        nonlocal k
+        game.inputs.push(cycle_direction(k, grid_size), game.engine.direction)
+        k += 1
+        game.update(game.speed)
+        game.render()
+
+    tick_peak, tick_retained = allocated(tick, ticks)
+
+    # Replay the snake along the cycle straight into the renderer, with a fading special food
+    renderer = game.renderer
+    cells = [cycle_cell(i, grid_size) for i in range(grid_size * grid_size)]
+    opacities = [1 - i / ticks for i in range(ticks + 1)]
+    place_snake(game.engine, length)
+    renderer.reset(game.engine.snake)
+    head = length - 1
+
+    def draw():
+        nonlocal head
+        head += 1
+        renderer.move_snake(cells[head % len(cells)], cells[(head - length) % len(cells)])
+        renderer.draw_food(cells[(head + 1) % len(cells)], "special", opacities[head % len(opacities)])
+        game.updates.begin()
+        renderer.flush()
+
+    draw_peak, draw_retained = allocated(draw, ticks, between=game.updates.flush)
+    return {
+        "tick_peak_bytes": tick_peak,
+        "tick_retained_bytes": tick_retained,
+        "draw_peak_bytes": draw_peak,
+        "draw_retained_bytes": draw_retained,
+    }
+
+
+async def bench_high_scores(updates):
+    import main
+
+    game = main.SnakeGame(make_page(), autosave=False)
+    rng = random.Random(1)
+
+    def update():
+        game.engine.score = rng.randrange(10, 10000)
+        game.update_high_scores()
+
+    return {"updates_per_sec": timed(update, updates)}
+
+
+async def run(grid_size, lengths, ticks):
+    results = {
+        "grid_size": grid_size,
+        "renderer": "viewport" if os.environ.get("SNAKE_WORLD_SIZE") else os.environ.get("SNAKE_RENDERER", "stack"),
+        "lengths": {},
+        "high_scores": await bench_high_scores(max(ticks // 10, 10)),
+    }
+    for length in lengths:
+        results["lengths"][str(length)] = {
+            "engine_step": bench_engine_step(grid_size, length, ticks * 10),
+            "collision": bench_collision(grid_size, length, ticks * 100),
+            "spawn_food": bench_spawn_food(grid_size, length, ticks * 10),
+            "render": await bench_render(grid_size, length, ticks),
+            "alloc": await bench_alloc(grid_size, length, ticks),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lengths", default="1,100,1000")
+    parser.add_argument("--ticks", type=int, default=500)
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+
+    # The game is played on the whole world, GRID_SIZE unless SNAKE_WORLD_SIZE is set
+    from assets.styles.styles import WORLD_SIZE
+
+    # Keep high scores and settings away from the real user data dir
+    os.environ["XDG_DATA_HOME"] = tempfile.mkdtemp(prefix="snake-bench-")
+    lengths = [n for n in map(int, args.lengths.split(",")) if n < WORLD_SIZE * WORLD_SIZE]
+    results = asyncio.run(run(WORLD_SIZE, lengths, args.ticks))
+    with open(args.output, "w") as f:
+        json.dump(results, f)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import asyncio
+import dataclasses
+import gc
+import itertools
+import json
+import time
+import tracemalloc
+
+import flet as ft
+from flet.core.connection import Connection
+from flet.core.protocol import PageCommandResponsePayload, PageCommandsBatchResponsePayload
+
+
+class NullConnection(Connection):
+    """Flet connection that never talks to a client.
+
+    It answers "add" commands with fresh control ids, like the real client,
+    and counts round-trips, added controls and serialized bytes.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.ids = itertools.count(1)
+        self.round_trips = 0
+        self.controls_added = 0
+        self.bytes_sent = 0
+
+    def send_command(self, session_id, command):
+        self.round_trips += 1
+        self.bytes_sent += len(json.dumps(dataclasses.asdict(command)))
+        return PageCommandResponsePayload(result="", error="")
+
+    def send_commands(self, session_id, commands):
+        self.round_trips += 1
+        self.bytes_sent += len(json.dumps([dataclasses.asdict(c) for c in commands]))
+        results = []
+        for command in commands:
+            if command.name == "add":
+                self.controls_added += len(command.commands)
+                results.append(" ".join(f"_{next(self.ids)}" for _ in command.commands))
+        return PageCommandsBatchResponsePayload(results=results, error="")
+
+    def counters(self):
+        return self.round_trips, self.controls_added, self.bytes_sent
+
+
+def make_page():
+    """A real ft.Page backed by a NullConnection; needs a running event loop"""
+    return ft.Page(NullConnection(), "benchmark", asyncio.get_running_loop())
+
+
+def cycle_cell(k, grid_size):
+    """k-th cell of a Hamiltonian cycle on the torus (grid_size - 1 steps right, then one down)"""
+    row, col = divmod(k % (grid_size * grid_size), grid_size)
+    return ((col - row) % grid_size, row)
+
+
+def cycle_direction(k, grid_size):
+    """Direction that leads from cycle cell k to cycle cell k + 1"""
+    return (0, 1) if k % grid_size == grid_size - 1 else (1, 0)
+
+
+def place_snake(engine, length):
+    """Lay a snake of the given length along the cycle and return the head's cycle index"""
+    for pos in engine.snake:
+        engine.release(pos)
+    engine.snake.clear()
+    for k in range(length - 1, -1, -1):
+        pos = cycle_cell(k, engine.grid_size)
+        engine.snake.append(pos)
+        engine.occupy(pos)
+    engine.direction = cycle_direction(length - 2, engine.grid_size) if length > 1 else (1, 0)
+    engine.spawn_food()
+    return length - 1
+
+
+def timed(fn, repeat):
+    """Run fn repeat times and return calls per second"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = time.perf_counter() - start
+    return repeat / elapsed if elapsed else float("inf")
+
+
+def peak_memory(fn, repeat):
+    """Peak traced memory in bytes while running fn repeat times"""
+    tracemalloc.start()
+    try:
+        for _ in range(repeat):
+            fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def allocated(fn, repeat, between=None):
+    """Mean traced bytes per call of fn: peak above the level before the call, and net growth.
+
+    between() runs after each call, outside the measurement. Cyclic garbage
+    is collected before the growth is read, so it only counts live objects.
+    """
+    tracemalloc.start()
+    try:
+        fn()  # Warm-up: first-call caches are not per-tick costs
+        if between:
+            between()
+        gc.collect()
+        start = tracemalloc.get_traced_memory()[0]
+        peak = 0
+        for _ in range(repeat):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            fn()
+            peak += tracemalloc.get_traced_memory()[1] - before
+            if between:
+                between()
+        gc.collect()
+        return peak / repeat, (tracemalloc.get_traced_memory()[0] - start) / repeat
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,107 @@
+"""Headless benchmark sweep over grid sizes, renderers and snake lengths.
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --output new.json --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_one(grid_size, renderer, lengths, ticks):
+    """Run bench_game in a fresh process for one grid size and renderer"""
+    fd, output = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    env = dict(os.environ, SNAKE_GRID_SIZE=str(grid_size), SNAKE_RENDERER=renderer)
+    try:
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_game",
+             "--lengths", lengths, "--ticks", str(ticks), "--output", output],
+            cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL,
+        )
+        with open(output) as f:
+            return json.load(f)
+    finally:
+        os.remove(output)
+
+
+def flatten(results):
+    """Map "grid/renderer/length/benchmark/metric" to value for comparisons"""
+    flat = {}
+    for run in results["runs"]:
+        prefix = f"{run['grid_size']}/{run['renderer']}"
+        for metric, value in run["high_scores"].items():
+            flat[f"{prefix}/high_scores/{metric}"] = value
+        for length, benches in run["lengths"].items():
+            for bench, metrics in benches.items():
+                for metric, value in metrics.items():
+                    flat[f"{prefix}/{length}/{bench}/{metric}"] = value
+    return flat
+
+
+def compare(old, new):
+    old_flat, new_flat = flatten(old), flatten(new)
+    print(f"{'metric':60} {'old':>14} {'new':>14} {'ratio':>8}")
+    for key, value in new_flat.items():
+        if key in old_flat and old_flat[key]:
+            print(f"{key:60} {old_flat[key]:14.1f} {value:14.1f} {value / old_flat[key]:8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--grid-sizes", default="20,50,100,200")
+    parser.add_argument("--renderers", default="stack,canvas")
+    parser.add_argument("--lengths", default="1,100,1000")
+    parser.add_argument("--ticks", type=int, default=500)
+    parser.add_argument("--output", default="benchmarks/results.json")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    args = parser.parse_args()
+
+    results = {
+        "commit": git_commit(),
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "runs": [],
+    }
+    for grid_size in map(int, args.grid_sizes.split(",")):
+        for renderer in args.renderers.split(","):
+            print(f"grid {grid_size} renderer {renderer}...", flush=True)
+            run = run_one(grid_size, renderer, args.lengths, args.ticks)
+            results["runs"].append(run)
+            for length, benches in run["lengths"].items():
+                render = benches["render"]
+                print(
+                    f"  length {length:>6}: {benches['engine_step']['ticks_per_sec']:>10.0f} engine ticks/s, "
+                    f"{render['ticks_per_sec']:>8.0f} rendered ticks/s, "
+                    f"{render['patch_bytes_per_tick']:>8.0f} B/tick, "
+                    f"{render['controls_created_per_tick']:.2f} controls/tick"
+                )
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Sound loading: compressed assets and audio controls created on first use.
+
+The WAV files in assets/sounds are the sources. Encode them to the MP3
+variants the game loads with:
+
+    python -m game.audio
+
+which needs ffmpeg on the PATH (or the imageio-ffmpeg package).
+"""
+import os
+import shutil
+import subprocess
+import sys
+
+import flet as ft
+
+SOUNDS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "sounds")
+COMPRESSED_FORMAT = "mp3"  # Plays in every browser and on desktop
+BITRATE = "96k"
+
+
+def sound_path(name):
+    """Path of a sound, preferring its compressed variant"""
+    compressed = os.path.join(SOUNDS_DIR, f"{name}.{COMPRESSED_FORMAT}")
+    if os.path.exists(compressed):
+        return compressed
+    return os.path.join(SOUNDS_DIR, f"{name}.wav")
+
+
+class LazyAudio:
+    """Stands in for an ft.Audio whose control is only created on first use.
+
+    Until play() or resume() is called nothing is added to the page, so the
+    file is not downloaded. The first call adds the control with autoplay,
+    since methods cannot be invoked on a control the client does not have
+    yet; pause() before the control reaches the client cancels the autoplay.
+    """
+
+    def __init__(self, page, src, updates=None, volume=None, **kwargs):
+        self.page = page
+        self.updates = updates or page  # Anything with update(*controls)
+        self.src = src
+        self.kwargs = kwargs
+        self._volume = volume
+        self.audio = None
+
+    @property
+    def volume(self):
+        return self._volume
+
+    @volume.setter
+    def volume(self, value):
+        self._volume = value
+        if self.audio:
+            self.audio.volume = value
+
+    def _start(self, method):
+        if self.audio is None:
+            self.audio = ft.Audio(src=self.src, autoplay=True, volume=self._volume, **self.kwargs)
+            self.page.overlay.append(self.audio)
+            self.updates.update()
+        elif self.audio.page is None:
+            self.audio.autoplay = True
+        else:
+            method()
+
+    def play(self):
+        self._start(lambda: self.audio.play())
+
+    def resume(self):
+        self._start(lambda: self.audio.resume())
+
+    def pause(self):
+        if self.audio is None:
+            return
+        if self.audio.page is None:
+            self.audio.autoplay = False
+        else:
+            self.audio.pause()
+
+
+def find_ffmpeg():
+    path = shutil.which("ffmpeg")
+    if path:
+        return path
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except ImportError:
+        return None
+
+
+def compress_sounds(sounds_dir=SOUNDS_DIR, force=False):
+    """Encode every WAV that has no up-to-date compressed variant"""
+    ffmpeg = find_ffmpeg()
+    if not ffmpeg:
+        print("Error compressing sounds: ffmpeg not found")
+        return 1
+    for name in sorted(os.listdir(sounds_dir)):
+        if not name.endswith(".wav"):
+            continue
+        source = os.path.join(sounds_dir, name)
+        target = os.path.join(sounds_dir, f"{name[:-4]}.{COMPRESSED_FORMAT}")
+        if not force and os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(source):
+            continue
+        try:
+            subprocess.run(
+                [ffmpeg, "-y", "-loglevel", "error", "-i", source, "-map_metadata", "-1", "-b:a", BITRATE, target],
+                check=True,
+            )
+        except subprocess.CalledProcessError as e:
+            print(f"Error compressing {name}: {e}")
+            return 1
+        print(f"{name}: {os.path.getsize(source) // 1024} KiB -> {os.path.getsize(target) // 1024} KiB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(compress_sounds(force="--force" in sys.argv[1:]))
@@ -0,0 +1,281 @@
+import heapq
+from array import array
+
+from game.engine import DIRECTIONS
+
+NEVER = 0xFFFFFFFF  # blocked value of a cell that cannot be entered
+
+
+class Autopilot:
+    """Steers a SnakeEngine toward the food with A* on the wrapping grid.
+
+    A path to the food is only taken if, once the snake has eaten at its
+    end, the new tail is still reachable from the new head; the plan is then
+    followed until the food leaves its predicted track. Moving special food is
+    aimed at where it will be when the snake gets there, so its regular moves
+    do not cause a replan. Without a safe path the snake chases its tail,
+    taking the move that keeps the tail farthest away, and when the tail is
+    out of reach heads for the largest open area.
+
+    Body cells are obstacles only until the tail has moved past them. Every
+    decision expands about search_budget cells at most, so its cost does
+    not grow with the grid. Search buffers are compact arrays allocated once
+    and reused with a generation stamp instead of clearing.
+    """
+
+    def __init__(self, grid_size, search_budget=2000):
+        self.grid_size = grid_size
+        self.search_budget = search_budget
+        cells = grid_size * grid_size
+        self.seen = array("I", bytes(4 * cells))  # Generation stamp of the search that reached each cell
+        self.dist = array("I", bytes(4 * cells))
+        self.parent = array("I", bytes(4 * cells))
+        # First step at which a body cell can be entered, 0 for free cells
+        self.blocked = array("I", bytes(4 * cells))
+        self.marked = []  # Cells with a blocked value
+        self.growth = 0  # Engine growth the marks were made with
+        self.generation = 0
+        self.budget = 0  # Cells left to expand in this decision
+        self.plan = []  # Remaining directions to the target, next move last
+        self.plan_head = None
+        self.plan_food = None  # Food track the plan was made for, see _track()
+
+    def _mark_body(self, body, growth):
+        """Set blocked for the body cells, head first: segment i frees up after growth + len - i steps"""
+        blocked = self.blocked
+        for cell in self.marked:
+            blocked[cell] = 0
+        length = len(body)
+        for i, cell in enumerate(body):
+            blocked[cell] = length - i + 1 + growth
+        self.marked = body
+        self.growth = growth
+
+    def _search(self, start, target, offset=0):
+        """A* from start to target, returns the number of steps or -1.
+
+        offset is the number of steps already taken before start, which
+        frees that many more tail cells. Gives up when the budget runs out.
+        """
+        grid_size = self.grid_size
+        self.generation += 1
+        generation = self.generation
+        seen, dist, parent, blocked = self.seen, self.dist, self.parent, self.blocked
+        half = grid_size // 2
+        heappop, heappush = heapq.heappop, heapq.heappush
+        ty, tx = divmod(target, grid_size)
+        seen[start] = generation
+        dist[start] = 0
+        heap = [(0, 0, start)]
+        while heap:
+            _, steps, cell = heappop(heap)
+            if cell == target:
+                return -steps
+            if -steps != dist[cell]:
+                continue  # Stale entry
+            if self.budget <= 0:
+                return -1
+            self.budget -= 1
+            y, x = divmod(cell, grid_size)
+            next_steps = dist[cell] + 1
+            for dx, dy in DIRECTIONS:
+                nx = (x + dx) % grid_size
+                ny = (y + dy) % grid_size
+                neighbor = ny * grid_size + nx
+                if blocked[neighbor] > next_steps + offset:
+                    continue
+                if seen[neighbor] == generation and dist[neighbor] <= next_steps:
+                    continue
+                seen[neighbor] = generation
+                dist[neighbor] = next_steps
+                parent[neighbor] = cell
+                # Wrapped Manhattan distance to the target, without calls in the hot loop
+                hx = nx - tx if nx >= tx else tx - nx
+                hy = ny - ty if ny >= ty else ty - ny
+                if hx > half:
+                    hx = grid_size - hx
+                if hy > half:
+                    hy = grid_size - hy
+                heappush(heap, (next_steps + hx + hy, -next_steps, neighbor))
+        return -1
+
+    def _path_to(self, start, target):
+        """Cells from start (excluded) to target after a search, in order"""
+        path = []
+        cell = target
+        while cell != start:
+            path.append(cell)
+            cell = self.parent[cell]
+        path.reverse()
+        return path
+
+    def _direction(self, cell, neighbor):
+        grid_size = self.grid_size
+        dx = (neighbor % grid_size - cell % grid_size) % grid_size
+        dy = (neighbor // grid_size - cell // grid_size) % grid_size
+        return (1 if dx == 1 else -1 if dx else 0, 1 if dy == 1 else -1 if dy else 0)
+
+    def _neighbor(self, cell, direction):
+        grid_size = self.grid_size
+        x = (cell % grid_size + direction[0]) % grid_size
+        y = (cell // grid_size + direction[1]) % grid_size
+        return y * grid_size + x
+
+    def _track(self, engine):
+        """Food position, direction, first move tick and current tick, for _food_after()"""
+        next_move = 1 if engine.last_food_move >= engine.speed else 2
+        return engine.food, engine.food_direction, next_move, engine.ticks, engine.food_type
+
+    def _food_after(self, track, ticks):
+        """Where the food of a track is after ticks more ticks; special food moves every second tick"""
+        food, direction, next_move, _, food_type = track
+        if food_type != "special" or ticks < next_move:
+            return food
+        moves = (ticks - next_move) // 2 + 1
+        return (
+            (food[0] + direction[0] * moves) % self.grid_size,
+            (food[1] + direction[1] * moves) % self.grid_size,
+        )
+
+    def _food_path(self, engine, head):
+        """Shortest path to where the food can be intercepted, or None"""
+        grid_size = self.grid_size
+        track = self._track(engine)
+        food = engine.food
+        ticks = 0
+        for _ in range(4):
+            hx = abs(food[0] - head % grid_size)
+            hy = abs(food[1] - head // grid_size)
+            distance = min(hx, grid_size - hx) + min(hy, grid_size - hy)
+            if distance <= ticks:
+                # Reachable in time without obstacles, look for the real path
+                target = engine.cell_index(food)
+                if target == head or self._search(head, target) < 0:
+                    return None
+                path = self._path_to(head, target)
+                if self._food_after(track, len(path)) == food:
+                    return path
+                ticks = len(path)
+            else:
+                ticks = distance
+            food = self._food_after(track, ticks)
+        return None
+
+    def _safe_after(self, path, length):
+        """Whether the tail is still reachable after following path and eating at its end"""
+        blocked = self.blocked
+        growth = self.growth
+        steps = len(path)
+        # The tail moves on the steps before the food once the pending growth
+        # is used up, then stays put for the growth left plus one for the food
+        moved = max(0, steps - 1 - growth)
+        growth_after = max(0, growth - steps + 1) + 1
+        # After steps moves the body is the path, newest first, then what is
+        # left of the old body. Cells leave it tail first, old body then path.
+        freed = self.marked[max(0, length - moved):]
+        changed = freed + path
+        saved = [blocked[cell] for cell in changed]
+        for cell in freed:
+            blocked[cell] = 0
+        # The path may run over freed cells, and its own first cells may be freed too
+        for j, cell in enumerate(path, 1):
+            blocked[cell] = length + 1 + j + growth if length + j > moved else 0
+        tail = self.marked[length - 1 - moved] if moved < length else path[moved - length]
+        try:
+            return self._search(path[-1], tail, offset=moved - growth_after + growth) >= 0
+        finally:
+            for cell, value in zip(reversed(changed), reversed(saved)):
+                blocked[cell] = value
+
+    def choose(self, engine):
+        """Direction for the next tick, or None if no move is possible"""
+        head = engine.cell_index(engine.snake[0])
+        reverse = (-engine.direction[0], -engine.direction[1])
+
+        # Keep following the plan while the food stays on its predicted track
+        if self.plan and self.plan_head == head and engine.food is not None:
+            track = self.plan_food
+            if (
+                track[4] == engine.food_type
+                and track[1] == engine.food_direction
+                and self._food_after(track, engine.ticks - track[3]) == engine.food
+            ):
+                return self._follow(head)
+
+        self.plan = []
+        # Half the budget for the food, the rest (and what the food left) for staying safe
+        self.budget = self.search_budget // 2
+        body = [engine.cell_index(pos) for pos in engine.snake]
+        self._mark_body(body, engine.growth)
+        length = len(body)
+
+        if engine.food is not None:
+            path = self._food_path(engine, head)
+            if path and self._direction(head, path[0]) != reverse and self._safe_after(path, length):
+                self.plan = [self._direction(a, b) for a, b in zip(path[-2::-1], path[:0:-1])]
+                self.plan.append(self._direction(head, path[0]))
+                self.plan_food = self._track(engine)
+                return self._follow(head)
+
+        moves = [
+            (direction, self._neighbor(head, direction))
+            for direction in DIRECTIONS
+            if direction != reverse
+        ]
+        moves = [(direction, cell) for direction, cell in moves if self.blocked[cell] <= 1]
+
+        self.budget += self.search_budget - self.search_budget // 2
+
+        # Chase the tail: prefer the move with the longest path to it, then a
+        # move whose search ran out of budget (a large open area), then the
+        # largest closed pocket
+        best, best_score = None, None
+        food = engine.cell_index(engine.food) if engine.food is not None else None
+        for i, (direction, cell) in enumerate(moves):
+            share = self.budget // (len(moves) - i)
+            rest = self.budget - share
+            self.budget = share
+            if cell == food:
+                steps = 0 if self._safe_after([cell], length) else -1
+            elif length > 1 and food is not None:
+                # Eating on the way would hold the tail back, so go around the food
+                saved, self.blocked[food] = self.blocked[food], NEVER
+                steps = self._search(cell, body[-2], offset=1)
+                self.blocked[food] = saved
+            elif length > 1:
+                steps = self._search(cell, body[-2], offset=1)
+            else:
+                steps = 0
+            if steps >= 0:
+                score = (2, steps)
+            elif self.budget <= 0:
+                score = (1, 0)
+            else:
+                score = (0, share - self.budget)
+            self.budget += rest
+            if best_score is None or score > best_score:
+                best, best_score = direction, score
+        return best
+
+    def _follow(self, head):
+        direction = self.plan.pop()
+        self.plan_head = self._neighbor(head, direction)
+        return direction
+
+
+def play(engine, autopilot=None, max_ticks=None):
+    """Run a headless game driven by the autopilot until it ends.
+
+    Also stops when the snake has not eaten for a while (it is circling
+    after its tail) or after max_ticks.
+    """
+    autopilot = autopilot or Autopilot(engine.grid_size)
+    stall_limit = 4 * engine.grid_size * engine.grid_size
+    last_score, last_progress = engine.score, engine.ticks
+    while not engine.game_over and (max_ticks is None or engine.ticks < max_ticks):
+        engine.step(autopilot.choose(engine))
+        if engine.score != last_score:
+            last_score, last_progress = engine.score, engine.ticks
+        elif engine.ticks - last_progress > stall_limit:
+            break
+    return engine
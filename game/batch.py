@@ -0,0 +1,292 @@
+"""Vectorized simulation of many snake games at once (requires numpy).
+
+BatchEngine applies the same rules as SnakeEngine.step() to N games stored
+as arrays, one numpy operation per rule for all games. Each game draws from
+the batch's own random generator, so results match SnakeEngine
+statistically, not seed for seed.
+"""
+import numpy as np
+
+from game.engine import DIRECTIONS
+
+# Direction codes index DIRECTIONS; code ^ 1 is the opposite direction
+DX = np.array([dx for dx, _ in DIRECTIONS], dtype=np.int64)
+DY = np.array([dy for _, dy in DIRECTIONS], dtype=np.int64)
+RIGHT = DIRECTIONS.index((1, 0))
+NO_TURN = -1
+
+
+class BatchEngine:
+    """N independent games advanced together.
+
+    occupied is an N x cells uint8 occupancy grid (reshape to N x G x G for
+    a board view). Each snake body is a ring buffer of cell indices with the
+    head at body[i, head[i]] and length[i] cells behind it.
+    """
+
+    def __init__(
+        self,
+        n,
+        grid_size=20,
+        seed=None,
+        speed=0.08,
+        special_food_chance=0.05,
+        special_food_duration=4,
+    ):
+        self.n = n
+        self.grid_size = grid_size
+        self.cells = grid_size * grid_size
+        self.speed = speed
+        self.special_food_chance = special_food_chance
+        self.special_food_duration = special_food_duration
+        self.rng = np.random.default_rng(seed)
+
+        self.occupied = np.zeros((n, self.cells), dtype=np.uint8)
+        self.body = np.zeros((n, self.cells), dtype=np.int32)
+        self.head = np.zeros(n, dtype=np.int64)
+        self.length = np.zeros(n, dtype=np.int64)
+        self.growth = np.zeros(n, dtype=np.int64)  # Ticks the tail still stays put for
+        self.direction = np.zeros(n, dtype=np.int64)
+        self.food = np.zeros(n, dtype=np.int64)
+        self.special = np.zeros(n, dtype=bool)
+        self.food_direction = np.zeros(n, dtype=np.int64)
+        self.special_food_timer = np.zeros(n)
+        self.last_food_move = np.zeros(n)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.ticks = np.zeros(n, dtype=np.int64)
+        self.game_over = np.zeros(n, dtype=bool)
+        self.won = np.zeros(n, dtype=bool)
+        self.reset()
+
+    def reset(self, mask=None):
+        """Start new games for the selected games (all by default)"""
+        games = np.arange(self.n) if mask is None else np.flatnonzero(mask)
+        if not len(games):
+            return
+        center = (self.grid_size // 2) * self.grid_size + self.grid_size // 2
+        self.occupied[games] = 0
+        self.occupied[games, center] = 1
+        self.body[games, 0] = center
+        self.head[games] = 0
+        self.length[games] = 1
+        self.growth[games] = 0
+        self.direction[games] = RIGHT
+        self.special[games] = False
+        self.special_food_timer[games] = 0
+        self.last_food_move[games] = 0
+        self.score[games] = 0
+        self.ticks[games] = 0
+        self.game_over[games] = False
+        self.won[games] = False
+        self.spawn_food(games)
+
+    def spawn_food(self, games):
+        """Put food on a uniformly random free cell of each game"""
+        if not len(games):
+            return
+        free_count = self.cells - self.length[games]
+        full = free_count == 0
+        if full.any():
+            # The snake covers the whole board: the game is won
+            done = games[full]
+            self.game_over[done] = True
+            self.won[done] = True
+            self.special[done] = False
+            games, free_count = games[~full], free_count[~full]
+            if not len(games):
+                return
+
+        # Index of the pick-th free cell in each row
+        pick = (self.rng.random(len(games)) * free_count).astype(np.int64)
+        free_rank = np.cumsum(self.occupied[games] == 0, axis=1)
+        self.food[games] = np.argmax(free_rank > pick[:, None], axis=1)
+
+        special = self.rng.random(len(games)) < self.special_food_chance
+        self.special[games] = special
+        if special.any():
+            chosen = games[special]
+            self.special_food_timer[chosen] = 0
+            self.last_food_move[chosen] = 0
+            self.food_direction[chosen] = self.rng.integers(0, 4, len(chosen))
+
+    def _move_special_food(self, games):
+        g = self.grid_size
+        food = self.food[games]
+        x, y = food % g, food // g
+        d = self.food_direction[games]
+        target = ((y + DY[d]) % g) * g + (x + DX[d]) % g
+        # Bounce back when the next cell is part of the snake
+        blocked = self.occupied[games, target] == 1
+        d = np.where(blocked, d ^ 1, d)
+        self.food_direction[games] = d
+        self.food[games] = ((y + DY[d]) % g) * g + (x + DX[d]) % g
+
+    def step(self, actions=None, dt=None):
+        """Advance every running game by one tick.
+
+        actions holds a direction code (index into DIRECTIONS) per game, or
+        NO_TURN. Returns (points, done): points scored and games that ended
+        during this tick.
+        """
+        if dt is None:
+            dt = self.speed
+        g = self.grid_size
+        points = np.zeros(self.n, dtype=np.int64)
+        done = np.zeros(self.n, dtype=bool)
+        live = np.flatnonzero(~self.game_over)
+        if not len(live):
+            return points, done
+
+        # Turn unless the action reverses the snake
+        if actions is not None:
+            action = np.asarray(actions, dtype=np.int64)[live]
+            direction = self.direction[live]
+            turn = (action >= 0) & (action != (direction ^ 1))
+            self.direction[live] = np.where(turn, action, direction)
+
+        # Move special food at half snake speed
+        special = live[self.special[live]]
+        if len(special):
+            self.last_food_move[special] += dt
+            moving = special[self.last_food_move[special] >= self.speed * 2]
+            if len(moving):
+                self._move_special_food(moving)
+                self.last_food_move[moving] = 0
+
+        head_cell = self.body[live, self.head[live]]
+        d = self.direction[live]
+        new_head = ((head_cell // g + DY[d]) % g) * g + (head_cell % g + DX[d]) % g
+
+        # Check for collision with self
+        crashed = self.occupied[live, new_head] == 1
+        if crashed.any():
+            self.game_over[live[crashed]] = True
+            done[live[crashed]] = True
+        live, new_head = live[~crashed], new_head[~crashed]
+
+        self.head[live] = (self.head[live] + 1) % self.cells
+        self.body[live, self.head[live]] = new_head
+        self.occupied[live, new_head] = 1
+        self.ticks[live] += 1
+
+        ate = new_head == self.food[live]
+        eaters = live[ate]
+        points[eaters] = np.where(self.special[eaters], 30, 10)
+        self.score[eaters] += points[eaters]
+        self.length[eaters] += 1
+        self.growth[eaters] += 1
+
+        # The tail stays put for one more tick after each food
+        growing = ~ate & (self.growth[live] > 0)
+        growers = live[growing]
+        self.growth[growers] -= 1
+        self.length[growers] += 1
+
+        movers = live[~ate & ~growing]
+        tail = self.body[movers, (self.head[movers] - self.length[movers]) % self.cells]
+        self.occupied[movers, tail] = 0
+
+        self.spawn_food(eaters)
+        done[eaters[self.game_over[eaters]]] = True
+
+        # Expire special food
+        special = live[self.special[live] & ~self.game_over[live]]
+        if len(special):
+            self.special_food_timer[special] += dt
+            expired = special[self.special_food_timer[special] >= self.special_food_duration]
+            self.spawn_food(expired)
+
+        return points, done
+
+    def boards(self):
+        """Occupancy as an N x G x G view"""
+        return self.occupied.reshape(self.n, self.grid_size, self.grid_size)
+
+
+def self_check(games=200, ticks=2000, grid_size=10, seed=1):
+    """Run BatchEngine in lockstep with SnakeEngine games and compare them.
+
+    Both get the same random turns. Food placement draws from different
+    generators, so every food the SnakeEngine spawns is copied into the
+    batch; everything else has to follow from the rules. Returns the number
+    of game ticks where the two disagree.
+    """
+    import random
+
+    from game.engine import FOOD_SPAWNED, SnakeEngine
+
+    rng = random.Random(seed)
+    engines = [SnakeEngine(grid_size, seed=rng.randrange(2**32)) for _ in range(games)]
+    batch = BatchEngine(games, grid_size=grid_size, seed=seed)
+
+    def copy_food(i):
+        engine = engines[i]
+        if engine.food is None:
+            return
+        batch.food[i] = engine.cell_index(engine.food)
+        batch.special[i] = engine.food_type == "special"
+        if batch.special[i]:
+            batch.food_direction[i] = DIRECTIONS.index(engine.food_direction)
+        batch.special_food_timer[i] = engine.special_food_timer
+        batch.last_food_move[i] = engine.last_food_move
+
+    def differences(i):
+        engine = engines[i]
+        cells = [engine.cell_index(pos) for pos in engine.snake]
+        body = [int(batch.body[i, (batch.head[i] - k) % batch.cells]) for k in range(batch.length[i])]
+        checks = {
+            "body": (cells, body),
+            "direction": (DIRECTIONS.index(engine.direction), batch.direction[i]),
+            "score": (engine.score, batch.score[i]),
+            "ticks": (engine.ticks, batch.ticks[i]),
+            "growth": (engine.growth, batch.growth[i]),
+            "game over": (engine.game_over, batch.game_over[i]),
+            "won": (engine.won, batch.won[i]),
+            "special": (engine.food_type == "special", batch.special[i]),
+            "special food timer": (engine.special_food_timer, batch.special_food_timer[i]),
+            "last food move": (engine.last_food_move, batch.last_food_move[i]),
+        }
+        if engine.food is not None and not engine.game_over:
+            checks["food"] = (engine.cell_index(engine.food), batch.food[i])
+        return [name for name, (expected, actual) in checks.items() if expected != actual]
+
+    for i in range(games):
+        copy_food(i)
+    mismatches = finished = 0
+    for tick in range(ticks):
+        over = batch.game_over.copy()
+        if over.any():
+            finished += int(over.sum())
+            batch.reset(over)
+            for i in np.flatnonzero(over):
+                engines[i].reset(rng.randrange(2**32))
+                copy_food(i)
+        actions = np.full(games, NO_TURN)
+        for i in range(games):
+            if rng.random() < 0.3:
+                actions[i] = rng.randrange(4)
+        batch.step(actions)
+        for i, engine in enumerate(engines):
+            turn = DIRECTIONS[actions[i]] if actions[i] != NO_TURN else None
+            events = engine.step(turn)
+            if any(kind == FOOD_SPAWNED for kind, _ in events):
+                copy_food(i)
+            wrong = differences(i)
+            if wrong:
+                if not mismatches:
+                    print(f"game {i}, tick {tick}: {', '.join(wrong)} differ")
+                mismatches += 1
+                # Restart the game so one difference is not counted on every later tick
+                batch.game_over[i] = True
+                engine.game_over = True
+    print(f"{games} games, {ticks} ticks: {finished} finished, {mismatches} mismatches")
+    return mismatches
+
+
+if __name__ == "__main__":
+    import sys
+
+    if sys.argv[1:2] != ["check"]:
+        sys.exit("usage: python -m game.batch check [games] [ticks]")
+    args = [int(arg) for arg in sys.argv[2:4]]
+    sys.exit(1 if self_check(*args) else 0)
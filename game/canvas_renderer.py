@@ -0,0 +1,94 @@
+import flet.canvas as cv
+from collections import deque
+from assets.styles.styles import *
+from assets.styles.cells import *
+from game.renderer import BoardRenderer
+
+# The outline stroke is centred on its rectangle, so inset it by half its width
+OUTLINE_OFFSETS = tuple(offset + 1 for offset in CELL_OFFSETS)
+
+
+class CanvasRenderer(BoardRenderer):
+    """Board renderer drawing on a single flet.canvas.Canvas.
+
+    The background is one rectangle split by grid lines, so its size grows
+    with GRID_SIZE instead of GRID_SIZE squared. Each snake segment and the
+    food are a fill and an outline rectangle, pooled like in BoardRenderer.
+    Their styles are shared (fill, outline) paint pairs.
+    """
+
+    head_style = HEAD_PAINTS
+    body_style = BODY_PAINTS
+    normal_food_style = FOOD_PAINTS
+    special_food_styles = SPECIAL_FOOD_PAINTS
+
+    def __init__(self, page):
+        self.page = page
+        extent = BOARD_EXTENT
+
+        # Static background: board fill plus gaps drawn as lines
+        self.background = [cv.Rect(0, 0, extent, extent, paint=BOARD_PAINT)]
+        for offset in CELL_OFFSETS[1:]:
+            offset -= CELL_SPACING / 2
+            self.background.append(cv.Line(offset, 0, offset, extent, paint=GAP_PAINT))
+            self.background.append(cv.Line(0, offset, extent, offset, paint=GAP_PAINT))
+
+        self.food = (
+            cv.Rect(width=CELL_SIZE, height=CELL_SIZE, border_radius=CELL_BORDER_RADIUS, visible=False),
+            cv.Rect(width=CELL_SIZE - 2, height=CELL_SIZE - 2, border_radius=CELL_BORDER_RADIUS, visible=False),
+        )
+
+        self.drawn_food = None
+        self.drawn_food_style = None
+        self.styles = {}
+        self.control = cv.Canvas(self.background + list(self.food), width=extent, height=extent)
+        self.segments = deque()
+        self.head = None
+        self.pool = []
+        self.dirty = {}
+
+    def _new_segment(self):
+        segment = (
+            cv.Rect(width=CELL_SIZE, height=CELL_SIZE, border_radius=CELL_BORDER_RADIUS),
+            cv.Rect(width=CELL_SIZE - 2, height=CELL_SIZE - 2, border_radius=CELL_BORDER_RADIUS),
+        )
+        self.control.shapes.extend(segment)
+        self.mark(self.control)
+        return segment
+
+    def _hide_segment(self, segment):
+        for shape in segment:
+            shape.visible = False
+            self.mark(shape)
+
+    def _set_style(self, shapes, paints):
+        fill, outline = shapes
+        fill.paint, outline.paint = paints
+        self.mark(fill)
+        self.mark(outline)
+
+    def _place_shapes(self, shapes, pos):
+        fill, outline = shapes
+        fill.x = CELL_OFFSETS[pos[0]]
+        fill.y = CELL_OFFSETS[pos[1]]
+        outline.x = OUTLINE_OFFSETS[pos[0]]
+        outline.y = OUTLINE_OFFSETS[pos[1]]
+        fill.visible = True
+        outline.visible = True
+        self.mark(fill)
+        self.mark(outline)
+
+    def _place_segment(self, segment, pos, is_head):
+        self._place_shapes(segment, pos)
+        self._style_segment(segment, is_head)
+
+    def _draw_food(self, food, style):
+        fill, outline = self.food
+        if food is None:
+            fill.visible = False
+            outline.visible = False
+            self.mark(fill)
+            self.mark(outline)
+        else:
+            self._place_shapes(self.food, food)
+            self._style(self.food, style)
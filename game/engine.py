@@ -0,0 +1,234 @@
+import random
+from array import array
+from collections import deque
+
+DIRECTIONS = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+
+# Events emitted by SnakeEngine, delivered to listeners as (kind, data)
+MOVED = "moved"  # data: (new_head, removed_tail or None when growing)
+ATE = "ate"  # data: (position, food_type, points)
+FOOD_SPAWNED = "food_spawned"  # data: (position, food_type)
+FOOD_MOVED = "food_moved"  # data: position
+FOOD_EXPIRED = "food_expired"  # data: position
+FOOD_TYPE_CHANGED = "food_type_changed"  # data: new food type
+PAUSED = "paused"
+RESUMED = "resumed"
+BOARD_FULL = "board_full"  # data: score, followed by GAME_OVER
+GAME_OVER = "game_over"  # data: score
+
+
+class SnakeEngine:
+    """Snake rules without any UI or audio.
+
+    The engine is advanced one tick at a time with step(); everything it does
+    is reported as events, both in the returned list and to subscribers.
+    Given the same seed and inputs a game always plays out the same way.
+
+    Each food makes the snake two cells longer: one on the tick it is eaten
+    and one more on the next tick, when the tail stays put.
+    """
+
+    def __init__(
+        self,
+        grid_size=20,
+        seed=None,
+        speed=0.08,
+        special_food_chance=0.05,
+        special_food_duration=4,
+    ):
+        self.grid_size = grid_size
+        self.speed = speed
+        self.special_food_chance = special_food_chance
+        self.special_food_duration = special_food_duration
+        self.listeners = []
+        self.paused = False
+        self.food_type = "normal"
+        self.reset(seed)
+
+    def subscribe(self, callback):
+        """Register callback(kind, data) for every engine event"""
+        self.listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        self.listeners.remove(callback)
+
+    def emit(self, kind, data=None):
+        self.events.append((kind, data))
+        for callback in self.listeners:
+            callback(kind, data)
+
+    def reset(self, seed=None):
+        """Start a new game and return the events it produced"""
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.rng = random.Random(self.seed)
+        self.events = []
+        if self.paused:
+            self.paused = False
+            self.emit(RESUMED)
+
+        cells = self.grid_size * self.grid_size
+        # Occupancy grid kept in sync with the body, indexed by y * grid_size + x
+        self.occupied = bytearray(cells)
+        # Free-cell index: free_cells lists every empty cell index and
+        # free_slot maps a cell index to its slot in free_cells. Both are
+        # 4-byte arrays so large worlds stay compact.
+        self.free_cells = array("I", range(cells))
+        self.free_slot = array("I", range(cells))
+
+        center = self.grid_size // 2
+        self.snake = deque([(center, center)])
+        self.occupy((center, center))
+        self.direction = (1, 0)
+        self.growth = 0  # Ticks the tail still stays put for
+        self.score = 0
+        self.game_over = False
+        self.won = False
+        self.food = None
+        self.food_direction = (0, 0)
+        self.special_food_timer = 0
+        self.last_food_move = 0
+        self.ticks = 0
+        self.elapsed = 0  # Game time in seconds
+
+        # The food type carries over until spawn_food() reports a change
+        self.spawn_food()
+        return self.events
+
+    def cell_index(self, pos):
+        return pos[1] * self.grid_size + pos[0]
+
+    def is_occupied(self, pos):
+        """O(1) check whether the snake body covers pos"""
+        return self.occupied[pos[1] * self.grid_size + pos[0]] == 1
+
+    def occupy(self, pos):
+        """Mark pos as covered by the body and swap-remove it from the free cells"""
+        index = pos[1] * self.grid_size + pos[0]
+        self.occupied[index] = 1
+        slot = self.free_slot[index]
+        last = self.free_cells.pop()
+        if last != index:
+            self.free_cells[slot] = last
+            self.free_slot[last] = slot
+
+    def release(self, pos):
+        """Return pos to the free cells"""
+        index = pos[1] * self.grid_size + pos[0]
+        self.occupied[index] = 0
+        self.free_slot[index] = len(self.free_cells)
+        self.free_cells.append(index)
+
+    def set_paused(self, paused):
+        """Pause or resume the game; paused engines ignore step()"""
+        if paused != self.paused and not self.game_over:
+            self.paused = paused
+            self.emit(PAUSED if paused else RESUMED)
+
+    def is_valid_direction(self, new_dir, current_dir):
+        return not (new_dir[0] == -current_dir[0] and new_dir[1] == -current_dir[1])
+
+    def spawn_food(self):
+        """Spawn new food on a random free cell"""
+        previous_food_type = self.food_type
+        if not self.free_cells:
+            # The snake covers the whole board: the game is won
+            self.food = None
+            self.food_type = "normal"
+            self.food_direction = (0, 0)
+            self.game_over = True
+            self.won = True
+            if previous_food_type != "normal":
+                self.emit(FOOD_TYPE_CHANGED, "normal")
+            self.emit(BOARD_FULL, self.score)
+            self.emit(GAME_OVER, self.score)
+            return
+        index = self.free_cells[self.rng.randrange(len(self.free_cells))]
+        self.food = (index % self.grid_size, index // self.grid_size)
+        self.food_type = "special" if self.rng.random() < self.special_food_chance else "normal"
+        if self.food_type == "special":
+            self.special_food_timer = 0
+            self.food_direction = self.rng.choice(DIRECTIONS)
+            self.last_food_move = 0
+        else:
+            self.food_direction = (0, 0)
+        self.emit(FOOD_SPAWNED, (self.food, self.food_type))
+        if self.food_type != previous_food_type:
+            self.emit(FOOD_TYPE_CHANGED, self.food_type)
+
+    def move_special_food(self):
+        """Move special food in its current direction"""
+        new_x = (self.food[0] + self.food_direction[0]) % self.grid_size
+        new_y = (self.food[1] + self.food_direction[1]) % self.grid_size
+
+        # If new position collides with snake, reverse direction
+        if self.is_occupied((new_x, new_y)):
+            self.food_direction = (-self.food_direction[0], -self.food_direction[1])
+            new_x = (self.food[0] + self.food_direction[0]) % self.grid_size
+            new_y = (self.food[1] + self.food_direction[1]) % self.grid_size
+
+        self.food = (new_x, new_y)
+        self.emit(FOOD_MOVED, self.food)
+
+    def step(self, direction=None, dt=None):
+        """Advance the game by one tick.
+
+        direction is the requested turn (ignored if it reverses the snake),
+        dt the elapsed time in seconds, defaulting to one tick at self.speed.
+        Returns the list of (kind, data) events of this tick.
+        """
+        self.events = []
+        if self.game_over or self.paused:
+            return self.events
+        if dt is None:
+            dt = self.speed
+        self.elapsed += dt
+
+        if direction is not None and self.is_valid_direction(direction, self.direction):
+            self.direction = direction
+
+        # Move special food at half snake speed
+        if self.food_type == "special":
+            self.last_food_move += dt
+            if self.last_food_move >= self.speed * 2:
+                self.move_special_food()
+                self.last_food_move = 0
+
+        head = self.snake[0]
+        new_head = (
+            (head[0] + self.direction[0]) % self.grid_size,
+            (head[1] + self.direction[1]) % self.grid_size,
+        )
+
+        # Check for collision with self
+        if self.is_occupied(new_head):
+            self.game_over = True
+            self.emit(GAME_OVER, self.score)
+            return self.events
+
+        self.snake.appendleft(new_head)
+        self.occupy(new_head)
+        self.ticks += 1
+
+        if new_head == self.food:
+            points = 10 if self.food_type == "normal" else 30
+            self.score += points
+            self.growth += 1
+            self.emit(ATE, (new_head, self.food_type, points))
+            self.emit(MOVED, (new_head, None))
+            self.spawn_food()
+        elif self.growth:
+            self.growth -= 1
+            self.emit(MOVED, (new_head, None))
+        else:
+            tail = self.snake.pop()
+            self.release(tail)
+            self.emit(MOVED, (new_head, tail))
+
+        # Expire special food
+        if self.food_type == "special":
+            self.special_food_timer += dt
+            if self.special_food_timer >= self.special_food_duration:
+                self.emit(FOOD_EXPIRED, self.food)
+                self.spawn_food()
+
+        return self.events
@@ -0,0 +1,179 @@
+"""Gym-style reinforcement learning environments around SnakeEngine (requires numpy).
+
+Observations are grid_size x grid_size uint8 boards using the cell codes
+below, actions are direction codes (indices into DIRECTIONS) and rewards are
+the points scored, 10 for normal and 30 for special food.
+"""
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from game.engine import ATE, DIRECTIONS, SnakeEngine
+
+# Observation cell codes
+EMPTY = 0
+BODY = 1
+HEAD = 2
+FOOD = 3
+SPECIAL_FOOD = 4
+
+N_ACTIONS = len(DIRECTIONS)
+
+
+class SnakeEnv:
+    """Single game with a reset()/step(action) API.
+
+    Pass observation to have the board written into an existing
+    grid_size x grid_size uint8 array, such as a slice of shared memory.
+    """
+
+    def __init__(self, grid_size=20, seed=None, death_reward=0, max_ticks=None, observation=None, **rules):
+        self.grid_size = grid_size
+        self.death_reward = death_reward
+        self.max_ticks = max_ticks
+        self.engine = SnakeEngine(grid_size, seed=seed, **rules)
+        self.observation = np.zeros((grid_size, grid_size), dtype=np.uint8) if observation is None else observation
+        self._flat = self.observation.reshape(-1)
+        self._seeds = np.random.default_rng(seed)
+        self._observe()
+
+    def _observe(self):
+        engine = self.engine
+        flat = self._flat
+        flat[:] = np.frombuffer(engine.occupied, dtype=np.uint8)
+        flat[engine.cell_index(engine.snake[0])] = HEAD
+        if engine.food is not None:
+            flat[engine.cell_index(engine.food)] = SPECIAL_FOOD if engine.food_type == "special" else FOOD
+        return self.observation
+
+    def reset(self, seed=None):
+        if seed is None:
+            seed = int(self._seeds.integers(2**32))
+        self.engine.reset(seed)
+        return self._observe()
+
+    def step(self, action):
+        """Returns (observation, reward, done, info)"""
+        direction = DIRECTIONS[action] if action is not None and action >= 0 else None
+        events = self.engine.step(direction)
+        reward = sum(data[2] for kind, data in events if kind == ATE)
+        engine = self.engine
+        done = engine.game_over
+        if done and not engine.won:
+            reward += self.death_reward
+        truncated = self.max_ticks is not None and engine.ticks >= self.max_ticks
+        info = {"score": engine.score, "length": len(engine.snake), "won": engine.won, "truncated": truncated}
+        return self._observe(), reward, done or truncated, info
+
+
+class VectorEnv:
+    """Many SnakeEnvs stepped in lockstep.
+
+    Finished environments are reset automatically; the info of that step
+    keeps the final score. With workers > 0 the environments are sharded
+    across worker processes that write their boards straight into a shared
+    memory observation buffer.
+    """
+
+    def __init__(self, n, grid_size=20, seed=None, workers=0, **kwargs):
+        self.n = n
+        self.grid_size = grid_size
+        shape = (n, grid_size, grid_size)
+        seeds = [None if seed is None else seed + i for i in range(n)]
+        self.workers = []
+        self.shm = None
+        if workers:
+            self.shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)))
+            self.observations = np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf)
+            bounds = np.linspace(0, n, workers + 1).astype(int)
+            for start, stop in zip(bounds[:-1], bounds[1:]):
+                parent, child = mp.Pipe()
+                process = mp.Process(
+                    target=_worker,
+                    args=(child, self.shm.name, shape, start, stop, grid_size, seeds[start:stop], kwargs),
+                    daemon=True,
+                )
+                process.start()
+                child.close()
+                self.workers.append((parent, process, start, stop))
+        else:
+            self.observations = np.zeros(shape, dtype=np.uint8)
+            self.envs = [
+                SnakeEnv(grid_size, seed=seeds[i], observation=self.observations[i], **kwargs)
+                for i in range(n)
+            ]
+
+    def reset(self):
+        if self.workers:
+            for conn, _, _, _ in self.workers:
+                conn.send(("reset", None))
+            for conn, _, _, _ in self.workers:
+                conn.recv()
+        else:
+            for env in self.envs:
+                env.reset()
+        return self.observations
+
+    def step(self, actions):
+        """Returns (observations, rewards, dones, infos) for all environments"""
+        if self.workers:
+            for conn, _, start, stop in self.workers:
+                conn.send(("step", list(actions[start:stop])))
+            rewards, dones, infos = [], [], []
+            for conn, _, _, _ in self.workers:
+                r, d, i = conn.recv()
+                rewards += r
+                dones += d
+                infos += i
+        else:
+            rewards, dones, infos = _step_envs(self.envs, actions)
+        return self.observations, np.array(rewards), np.array(dones), infos
+
+    def close(self):
+        for conn, process, _, _ in self.workers:
+            conn.send(("close", None))
+            process.join()
+            conn.close()
+        self.workers = []
+        if self.shm:
+            self.observations = None
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+
+def _step_envs(envs, actions):
+    rewards, dones, infos = [], [], []
+    for env, action in zip(envs, actions):
+        _, reward, done, info = env.step(int(action))
+        if done:
+            env.reset()
+        rewards.append(reward)
+        dones.append(done)
+        infos.append(info)
+    return rewards, dones, infos
+
+
+def _worker(conn, shm_name, shape, start, stop, grid_size, seeds, kwargs):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    observations = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+    envs = [
+        SnakeEnv(grid_size, seed=seeds[i], observation=observations[start + i], **kwargs)
+        for i in range(stop - start)
+    ]
+    try:
+        while True:
+            command, data = conn.recv()
+            if command == "step":
+                conn.send(_step_envs(envs, data))
+            elif command == "reset":
+                for env in envs:
+                    env.reset()
+                conn.send(None)
+            else:
+                break
+    finally:
+        del observations, envs
+        shm.close()
+        conn.close()
@@ -0,0 +1,20 @@
+import os
+import tempfile
+
+
+def write_atomic(path, data, prefix=".tmp-"):
+    """Replace path with data (str or bytes) through a temporary file and a rename.
+
+    Readers see either the old file or the new one, never a partial write,
+    and a failed write leaves the old file in place.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=prefix, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb" if isinstance(data, bytes) else "w") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
@@ -0,0 +1,79 @@
+import threading
+import time
+from collections import deque
+
+
+class InputQueue:
+    """Bounded buffer of turn requests, applied one per tick in order.
+
+    Turns are checked once, when the key is pressed, against the direction
+    the snake will have after the turns already queued, so a quick up-then-left
+    within one tick keeps both. Reversals and repeats are ignored and turns
+    beyond the buffer size are dropped. Key handlers run in worker threads,
+    hence the lock.
+
+    Every turn keeps the time of its key event; rendered() measures how long
+    it took until the frame showing the turn was sent.
+    """
+
+    def __init__(self, size=3, history=240):
+        self.size = size
+        self.turns = deque()  # (direction, key time)
+        self.lock = threading.Lock()
+        self.applied = []  # Key times of turns taken since the last frame
+        self.latencies = deque(maxlen=history)
+        self.dropped = 0
+
+    def push(self, direction, current, timestamp=None):
+        """Queue a turn, current being the snake's direction right now. Returns whether it was kept"""
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        with self.lock:
+            last = self.turns[-1][0] if self.turns else current
+            if direction == last or direction == (-last[0], -last[1]):
+                return False
+            if len(self.turns) >= self.size:
+                self.dropped += 1
+                return False
+            self.turns.append((direction, timestamp))
+            return True
+
+    def pop(self):
+        """The next turn for this tick, or None"""
+        with self.lock:
+            if not self.turns:
+                return None
+            direction, timestamp = self.turns.popleft()
+        self.applied.append(timestamp)
+        return direction
+
+    def queued(self):
+        """Directions waiting to be applied, oldest first"""
+        with self.lock:
+            return [direction for direction, _ in self.turns]
+
+    def clear(self):
+        with self.lock:
+            self.turns.clear()
+        self.applied.clear()
+
+    def rendered(self, now=None):
+        """Record the input-to-render latency of the turns in the frame just sent"""
+        if not self.applied:
+            return
+        if now is None:
+            now = time.perf_counter()
+        self.latencies.extend(now - timestamp for timestamp in self.applied)
+        self.applied.clear()
+
+    def stats(self):
+        """Input latency telemetry over the recent history"""
+        latencies = sorted(self.latencies)
+        return {
+            "queued": len(self.turns),
+            "dropped": self.dropped,
+            "last_latency": self.latencies[-1] if latencies else 0.0,
+            "mean_latency": sum(latencies) / len(latencies) if latencies else 0.0,
+            "p95_latency": latencies[int(len(latencies) * 0.95)] if latencies else 0.0,
+            "max_latency": latencies[-1] if latencies else 0.0,
+        }
@@ -0,0 +1,99 @@
+"""Frame instrumentation for the performance HUD and metric files.
+
+Hooks in the game loop check metrics.enabled before timing anything, so a
+disabled Metrics costs one attribute lookup per hook. Enabled, each phase
+time goes into a rolling window and summary() reduces the windows, plus any
+registered stats() sources, to a flat dict of numbers.
+
+write(path) exports the summary: a .jsonl path gets one JSON line appended
+per call (rotated to path.1 past max_bytes), anything else an OpenMetrics
+text file that is replaced atomically.
+"""
+import json
+import os
+import time
+from collections import deque
+
+from game.files import write_atomic
+
+PHASES = ("logic", "draw", "update")  # Game rules, board diff, page.update round-trip
+
+
+class Metrics:
+    def __init__(self, history=120, max_bytes=1_000_000):
+        self.enabled = False
+        self.history = history
+        self.max_bytes = max_bytes
+        self.phases = {phase: deque(maxlen=history) for phase in PHASES}
+        self.ticks = deque(maxlen=history)  # Times of recent ticks
+        self.controls = deque(maxlen=history)  # Controls sent per frame
+        self.sources = {}  # name -> callable returning a dict of numbers
+        self.gauges = {}
+
+    def add_source(self, name, stats):
+        """Include stats() in every summary, prefixed with name"""
+        self.sources[name] = stats
+
+    def add(self, phase, seconds):
+        self.phases[phase].append(seconds)
+
+    def tick(self, now):
+        self.ticks.append(now)
+
+    def frame(self, controls):
+        self.controls.append(controls)
+
+    def set(self, name, value):
+        self.gauges[name] = value
+
+    def reset(self):
+        for window in self.phases.values():
+            window.clear()
+        self.ticks.clear()
+        self.controls.clear()
+
+    def tick_rate(self):
+        ticks = self.ticks
+        if len(ticks) < 2 or ticks[-1] == ticks[0]:
+            return 0.0
+        return (len(ticks) - 1) / (ticks[-1] - ticks[0])
+
+    def summary(self):
+        """Flat dict of the current numbers"""
+        result = {"tick_rate": self.tick_rate()}
+        for phase, window in self.phases.items():
+            values = sorted(window)
+            result[f"{phase}_mean"] = sum(values) / len(values) if values else 0.0
+            result[f"{phase}_p95"] = values[int(len(values) * 0.95)] if values else 0.0
+            result[f"{phase}_max"] = values[-1] if values else 0.0
+        controls = self.controls
+        result["controls_per_frame"] = sum(controls) / len(controls) if controls else 0.0
+        result.update(self.gauges)
+        for name, stats in self.sources.items():
+            for key, value in stats().items():
+                if isinstance(value, (int, float)):
+                    result[f"{name}_{key}"] = value
+        return result
+
+    def openmetrics(self, summary=None):
+        summary = summary or self.summary()
+        lines = []
+        for key, value in summary.items():
+            name = f"snake_{key}"
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {float(value)!r}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        try:
+            summary = self.summary()
+            if path.endswith(".jsonl"):
+                if os.path.exists(path) and os.path.getsize(path) > self.max_bytes:
+                    os.replace(path, path + ".1")
+                with open(path, "a") as f:
+                    f.write(json.dumps({"time": time.time(), **summary}) + "\n")
+                return
+            write_atomic(path, self.openmetrics(summary), prefix=".metrics-")
+        except Exception as e:
+            print(f"Error writing metrics: {e}")
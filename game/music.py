@@ -0,0 +1,45 @@
+from game.engine import FOOD_TYPE_CHANGED, GAME_OVER, PAUSED, RESUMED
+
+
+class MusicController:
+    """Switches background music in response to engine events.
+
+    The normal track plays while normal food is on the board and the special
+    track while special food is. Nothing runs between events, so switches
+    happen in the same tick as the food change.
+    """
+
+    def __init__(self, engine, tracks):
+        self.engine = engine
+        self.tracks = tracks  # {"normal": ft.Audio, "special": ft.Audio}
+        self.current = "normal"
+        engine.subscribe(self.on_engine_event)
+
+    def on_engine_event(self, kind, data):
+        if kind == FOOD_TYPE_CHANGED:
+            if not self.engine.paused:
+                self.switch(data)
+        elif kind == GAME_OVER:
+            # The special food is gone, fall back to the main theme
+            self.switch("normal")
+        elif kind == PAUSED:
+            self.tracks[self.current].pause()
+        elif kind == RESUMED:
+            self.current = self.engine.food_type
+            self.tracks[self.current].resume()
+
+    def start(self):
+        """Start the track for the current food type"""
+        self.current = self.engine.food_type
+        self.tracks[self.current].resume()
+
+    def switch(self, track):
+        if track != self.current:
+            self.tracks[self.current].pause()
+            self.tracks[track].resume()
+            self.current = track
+
+    def close(self):
+        """Stop the music and stop listening to the engine"""
+        self.engine.unsubscribe(self.on_engine_event)
+        self.tracks[self.current].pause()
@@ -0,0 +1,170 @@
+import flet as ft
+from collections import deque
+from assets.styles.styles import *
+from assets.styles.cells import *
+
+
+class BoardRenderer:
+    """Retained-mode board renderer.
+
+    The background cells are created once, snake segments come from a pool of
+    reusable containers and every tick only the cells that actually changed
+    are sent to the client. Positions and styles come from the tables in
+    assets/styles/cells.py, so a tick builds no new style objects.
+    """
+
+    # Shared style bundles, see _set_style()
+    head_style = HEAD_STYLE
+    body_style = BODY_STYLE
+    normal_food_style = FOOD_STYLE
+    special_food_styles = SPECIAL_FOOD_STYLES
+
+    def __init__(self, page):
+        # page is anything with update(*controls): an ft.Page or an UpdateBatcher
+        self.page = page
+
+        # Static background layer, never touched after construction
+        self.background = []
+        for y in range(GRID_SIZE):
+            for x in range(GRID_SIZE):
+                self.background.append(
+                    ft.Container(
+                        width=CELL_SIZE,
+                        height=CELL_SIZE,
+                        left=CELL_OFFSETS[x],
+                        top=CELL_OFFSETS[y],
+                        bgcolor=BOARD_COLOR,
+                        border_radius=CELL_BORDER_RADIUS,
+                    )
+                )
+
+        self.food = ft.Container(
+            width=CELL_SIZE,
+            height=CELL_SIZE,
+            border_radius=CELL_BORDER_RADIUS,
+            animate=FOOD_ANIMATION,
+            visible=False,
+        )
+
+        self.drawn_food = None  # Position and style last sent to the client
+        self.drawn_food_style = None
+        self.styles = {}  # Control -> style bundle it currently has
+        self.control = ft.Stack(self.background + [self.food])
+        self.segments = deque()  # Segment controls, head first
+        self.head = None  # Position of the head segment
+        self.pool = []  # Hidden segment controls ready for reuse
+        self.dirty = {}  # Controls changed since the last flush (ordered set)
+
+    def mark(self, control):
+        self.dirty[control] = None
+
+    def _new_segment(self):
+        segment = ft.Container(
+            width=CELL_SIZE,
+            height=CELL_SIZE,
+            border_radius=CELL_BORDER_RADIUS,
+        )
+        self.control.controls.append(segment)
+        self.mark(self.control)
+        return segment
+
+    def _take_segment(self):
+        """Get a segment control from the pool or create a new one"""
+        if self.pool:
+            return self.pool.pop()
+        return self._new_segment()
+
+    def _hide_segment(self, segment):
+        segment.visible = False
+        self.mark(segment)
+
+    def _style(self, control, style):
+        """Give a control a style bundle, unless it already has that one"""
+        if self.styles.get(control) is not style:
+            self.styles[control] = style
+            self._set_style(control, style)
+
+    def _set_style(self, control, style):
+        for name, value in style.items():
+            setattr(control, name, value)
+        self.mark(control)
+
+    def _style_segment(self, segment, is_head):
+        self._style(segment, self.head_style if is_head else self.body_style)
+
+    def _place_segment(self, segment, pos, is_head):
+        segment.left = CELL_OFFSETS[pos[0]]
+        segment.top = CELL_OFFSETS[pos[1]]
+        segment.visible = True
+        self.mark(segment)
+        self._style_segment(segment, is_head)
+
+    def reset(self, snake):
+        """Resynchronise all segments with the given snake body"""
+        while self.segments:
+            segment = self.segments.pop()
+            self._hide_segment(segment)
+            self.pool.append(segment)
+        for i, pos in enumerate(snake):
+            segment = self._take_segment()
+            self._place_segment(segment, pos, i == 0)
+            self.segments.append(segment)
+        self.head = snake[0] if snake else None
+
+    def move_snake(self, new_head, tail=None):
+        """Advance the snake by one cell.
+
+        The head control keeps its style and moves to new_head, and the cell
+        it left gets a body segment: the removed tail's control when the snake
+        moved without growing (pass the tail position), a new one otherwise.
+        No control changes style on a normal tick.
+        """
+        segments = self.segments
+        if not segments:
+            segment = self._take_segment()
+            self._place_segment(segment, new_head, True)
+            segments.append(segment)
+            self.head = new_head
+            return
+        head = segments.popleft()
+        if tail is None or segments:
+            segment = segments.pop() if tail is not None else self._take_segment()
+            self._place_segment(segment, self.head, False)
+            segments.appendleft(segment)
+        self._place_segment(head, new_head, True)
+        segments.appendleft(head)
+        self.head = new_head
+
+    def draw_food(self, food, food_type, opacity=1):
+        """Move the food control and apply the style for its type.
+
+        Special food fades in OPACITY_STEPS steps, so it is only redrawn when
+        the step changes.
+        """
+        if food_type == "special":
+            style = self.special_food_styles[opacity_step(opacity)]
+        else:
+            style = self.normal_food_style
+        if food == self.drawn_food and style is self.drawn_food_style:
+            return
+        self.drawn_food = food
+        self.drawn_food_style = style
+        self._draw_food(food, style)
+
+    def _draw_food(self, food, style):
+        if food is None:
+            self.food.visible = False
+        else:
+            self.food.visible = True
+            self.food.left = CELL_OFFSETS[food[0]]
+            self.food.top = CELL_OFFSETS[food[1]]
+            self._style(self.food, style)
+        self.mark(self.food)
+
+    def flush(self):
+        """Send only the changed controls to the client"""
+        if not self.dirty:
+            return
+        controls = list(self.dirty)
+        self.dirty.clear()
+        self.page.update(*controls)
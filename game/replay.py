@@ -0,0 +1,195 @@
+"""Compact binary game recordings.
+
+A replay is a header (format version, grid size, RNG seed and rule settings)
+followed by one opcode per tick, so a game replays exactly from its seed:
+
+    0x01-0x04        one tick with a turn request (up, down, left, right)
+    0x80 | n         n ticks (1-127) without input
+    0x10 + f64       the tick speed changed
+    0x11 + f64       the next tick ran with this dt instead of the speed
+    0xFF + u32 u32   end of game: final score and tick count
+
+Usage: python -m game.replay verify FILE...
+"""
+import asyncio
+import os
+import struct
+import sys
+
+from game.engine import SnakeEngine
+
+MAGIC = b"SNKR"
+VERSION = 2  # Version 1 games were played with one cell of growth per food
+HEADER = struct.Struct("<4sBHIddd")
+F64 = struct.Struct("<d")
+END = struct.Struct("<II")
+
+OP_SPEED = 0x10
+OP_DT = 0x11
+OP_SKIP = 0x80
+OP_END = 0xFF
+MAX_SKIP = 0x7F
+
+DIRECTION_CODES = {(0, -1): 1, (0, 1): 2, (-1, 0): 3, (1, 0): 4}
+CODE_DIRECTIONS = {code: direction for direction, code in DIRECTION_CODES.items()}
+
+
+class ReplayRecorder:
+    """Writes a replay of one game incrementally while it is played"""
+
+    def __init__(self, path, engine, buffer_size=4096):
+        self.path = path
+        self.engine = engine
+        self.buffer_size = buffer_size
+        self.speed = engine.speed
+        self.skip = 0  # Pending run of input-less ticks
+        self.buffer = bytearray(HEADER.pack(
+            MAGIC, VERSION, engine.grid_size, engine.seed,
+            engine.special_food_chance, engine.special_food_duration, engine.speed,
+        ))
+        self.file = open(path, "wb")
+
+    def _flush_skip(self):
+        if self.skip:
+            self.buffer.append(OP_SKIP | self.skip)
+            self.skip = 0
+
+    def record(self, direction, dt):
+        """Record the input of the tick that is about to run"""
+        speed = self.engine.speed
+        if speed != self.speed:
+            self._flush_skip()
+            self.buffer.append(OP_SPEED)
+            self.buffer += F64.pack(speed)
+            self.speed = speed
+        if dt != speed:
+            self._flush_skip()
+            self.buffer.append(OP_DT)
+            self.buffer += F64.pack(dt)
+
+        code = DIRECTION_CODES.get(direction)
+        if code:
+            self._flush_skip()
+            self.buffer.append(code)
+        else:
+            self.skip += 1
+            if self.skip == MAX_SKIP:
+                self._flush_skip()
+
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self.file and self.buffer:
+            self.file.write(self.buffer)
+            self.buffer.clear()
+
+    def finish(self):
+        """Write the end marker with the final score and close the file"""
+        if not self.file:
+            return
+        self._flush_skip()
+        self.buffer.append(OP_END)
+        self.buffer += END.pack(self.engine.score, self.engine.ticks)
+        self.flush()
+        self.file.close()
+        self.file = None
+
+
+class Replay:
+    """A parsed replay file"""
+
+    def __init__(self, data):
+        magic, version, grid_size, seed, chance, duration, speed = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Not a snake replay")
+        if version != VERSION:
+            raise ValueError(f"Unsupported replay version {version}")
+        self.grid_size = grid_size
+        self.seed = seed
+        self.special_food_chance = chance
+        self.special_food_duration = duration
+        self.speed = speed
+        self.data = data
+        self.score = None  # Recorded final score, if the game finished
+        self.ticks = None
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls(f.read())
+
+    def create_engine(self):
+        return SnakeEngine(
+            self.grid_size,
+            seed=self.seed,
+            speed=self.speed,
+            special_food_chance=self.special_food_chance,
+            special_food_duration=self.special_food_duration,
+        )
+
+    def inputs(self):
+        """Yield (direction, dt, speed) for every recorded tick"""
+        data = self.data
+        pos = HEADER.size
+        speed = self.speed
+        dt = None
+        while pos < len(data):
+            op = data[pos]
+            pos += 1
+            if op == OP_END:
+                self.score, self.ticks = END.unpack_from(data, pos)
+                return
+            if op == OP_SPEED:
+                speed = F64.unpack_from(data, pos)[0]
+                pos += F64.size
+            elif op == OP_DT:
+                dt = F64.unpack_from(data, pos)[0]
+                pos += F64.size
+            elif op & OP_SKIP:
+                for _ in range(op & MAX_SKIP):
+                    yield None, dt or speed, speed
+                    dt = None
+            else:
+                yield CODE_DIRECTIONS[op], dt or speed, speed
+                dt = None
+
+    def play(self, engine=None):
+        """Replay every tick as fast as possible and return the engine"""
+        engine = engine or self.create_engine()
+        for direction, dt, speed in self.inputs():
+            engine.speed = speed
+            engine.step(direction, dt)
+        return engine
+
+    async def play_realtime(self, engine=None, rate=1.0):
+        """Replay at rate times real speed, yielding to the event loop between ticks"""
+        engine = engine or self.create_engine()
+        for direction, dt, speed in self.inputs():
+            engine.speed = speed
+            engine.step(direction, dt)
+            await asyncio.sleep(dt / rate)
+        return engine
+
+    def verify(self):
+        """Replay headlessly and check the final score against the recorded one"""
+        engine = self.play()
+        return engine.score == self.score and engine.ticks == self.ticks, engine
+
+
+def main(argv):
+    if len(argv) < 2 or argv[0] != "verify":
+        print(__doc__)
+        return 2
+    failed = 0
+    for path in argv[1:]:
+        replay = Replay.load(path)
+        ok, engine = replay.verify()
+        failed += not ok
+        status = "ok" if ok else f"MISMATCH (recorded {replay.score})"
+        print(f"{os.path.basename(path)}: score {engine.score}, {engine.ticks} ticks, {status}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
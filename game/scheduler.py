@@ -0,0 +1,98 @@
+import asyncio
+from collections import deque
+
+# What to do with deadlines that were missed entirely
+CATCH_UP = "catch_up"  # run the missed ticks back to back, up to max_catch_up
+DROP = "drop"  # skip them and fold their time into the next tick
+
+
+class FixedStepScheduler:
+    """Fixed-timestep loop driven by the event loop clock.
+
+    Deadlines are kept on an absolute grid (start + n * period), so time spent
+    in the tick, rendering or page.update no longer stretches the period.
+    Every tick records how late it started. While inactive (paused or game
+    over) the loop sleeps until set_active(True) instead of ticking.
+    """
+
+    def __init__(self, period, policy=CATCH_UP, max_catch_up=2, history=240):
+        self.period = period
+        self.policy = policy
+        self.max_catch_up = max_catch_up
+        self.running = False
+        self.active = True
+        self.loop = None
+        self.wake = None
+        self.ticks = 0
+        self.caught_up = 0  # extra ticks run to recover missed deadlines
+        self.dropped = 0  # missed deadlines that were skipped
+        self.lateness = deque(maxlen=history)  # seconds late, per tick
+
+    async def run(self, update, render):
+        """Call update(dt) every period and render() once after each batch of updates"""
+        loop = self.loop = asyncio.get_running_loop()
+        self.wake = asyncio.Event()
+        self.running = True
+        deadline = loop.time() + self.period
+        while self.running:
+            if not self.active:
+                self.wake.clear()
+                await self.wake.wait()
+                deadline = loop.time() + self.period
+                continue
+            delay = deadline - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                # Still yield so input handlers get a chance to run
+                await asyncio.sleep(0)
+            if not self.running:
+                break
+
+            period = self.period
+            late = loop.time() - deadline
+            self.lateness.append(max(0.0, late))
+
+            # Dropped deadlines still count as elapsed time for the last update
+            missed = int(late // period) if late > 0 else 0
+            extra = min(missed, self.max_catch_up) if self.policy == CATCH_UP else 0
+            steps = 1 + extra
+            self.caught_up += extra
+            self.dropped += missed - extra
+            deadline += missed * period
+
+            for i in range(steps):
+                if i == steps - 1:
+                    update(period * (1 + missed - extra))
+                else:
+                    update(period)
+            self.ticks += steps
+            render()
+            deadline += period
+
+    def _wake(self):
+        # May be called from input handler threads
+        if self.loop and self.wake:
+            self.loop.call_soon_threadsafe(self.wake.set)
+
+    def set_active(self, active):
+        self.active = active
+        if active:
+            self._wake()
+
+    def stop(self):
+        self.running = False
+        self._wake()
+
+    def stats(self):
+        """Frame-time telemetry over the recent history"""
+        lateness = self.lateness
+        return {
+            "period": self.period,
+            "ticks": self.ticks,
+            "caught_up": self.caught_up,
+            "dropped": self.dropped,
+            "last_lateness": lateness[-1] if lateness else 0.0,
+            "mean_lateness": sum(lateness) / len(lateness) if lateness else 0.0,
+            "max_lateness": max(lateness) if lateness else 0.0,
+        }
@@ -0,0 +1,135 @@
+import bisect
+import json
+import os
+import sqlite3
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    score INTEGER NOT NULL,
+    length INTEGER,
+    duration REAL,
+    speed REAL,
+    date TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_by_score ON games (score DESC, id);
+"""
+SCHEMA_VERSION = 1
+
+
+class ScoreStore:
+    """Every finished game, kept in a local SQLite database.
+
+    All database work happens on one worker thread. The top scores are also
+    cached in memory, so the UI never waits for the database: recording a
+    game updates the cache right away and queues the insert.
+    """
+
+    def __init__(self, path, legacy_json=None, cache_size=10):
+        self.path = path
+        self.cache_size = cache_size
+        # No worker threads in the browser build, run everything inline there
+        self.executor = None if sys.platform == "emscripten" else ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="scores"
+        )
+        self.conn = None
+        self.top = self._run(self._open, legacy_json).result()
+        self._keys = [-entry['score'] for entry in self.top]
+
+    def _run(self, fn, *args):
+        if self.executor:
+            return self.executor.submit(fn, *args)
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def _open(self, legacy_json):
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < SCHEMA_VERSION:
+            if legacy_json:
+                self._migrate(legacy_json)
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self.conn.commit()
+        return self._query_top(self.cache_size)
+
+    def _migrate(self, legacy_json):
+        """Import the scores of the old high_scores.json, once"""
+        try:
+            if os.path.exists(legacy_json):
+                with open(legacy_json, 'r') as f:
+                    entries = json.load(f)
+                # The file is sorted best first; insert worst first so ties keep their order
+                self.conn.executemany(
+                    "INSERT INTO games (score, date) VALUES (?, ?)",
+                    [(entry['score'], entry['date']) for entry in reversed(entries)],
+                )
+        except Exception as e:
+            print(f"Error migrating high scores: {e}")
+
+    def _query_top(self, n):
+        rows = self.conn.execute(
+            "SELECT * FROM games WHERE score > 0 ORDER BY score DESC, id LIMIT ?", (n,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def _insert(self, entry):
+        try:
+            self.conn.execute(
+                "INSERT INTO games (score, length, duration, speed, date) VALUES (?, ?, ?, ?, ?)",
+                (entry['score'], entry['length'], entry['duration'], entry['speed'], entry['date']),
+            )
+            self.conn.commit()
+        except Exception as e:
+            print(f"Error saving score: {e}")
+
+    def add(self, score, length, duration, speed):
+        """Record a finished game and return its entry"""
+        entry = {
+            'score': score,
+            'length': length,
+            'duration': duration,
+            'speed': speed,
+            'date': datetime.now().strftime('%Y-%m-%d %H:%M'),
+        }
+        if score > 0:
+            # Bounded insert into the cached top list, after equal scores
+            i = bisect.bisect_right(self._keys, -score)
+            if i < self.cache_size:
+                self._keys.insert(i, -score)
+                self.top.insert(i, entry)
+                del self._keys[self.cache_size:]
+                del self.top[self.cache_size:]
+        self._run(self._insert, entry)
+        return entry
+
+    def top_scores(self, n=10):
+        if n <= self.cache_size:
+            return self.top[:n]
+        return self._run(self._query_top, n).result()
+
+    def personal_best(self):
+        return self.top[0]['score'] if self.top else 0
+
+    def history(self, limit=100):
+        """Most recent games first"""
+        def query():
+            rows = self.conn.execute(
+                "SELECT * FROM games ORDER BY id DESC LIMIT ?", (limit,)
+            ).fetchall()
+            return [dict(row) for row in rows]
+        return self._run(query).result()
+
+    def close(self):
+        """Finish pending writes and close the database"""
+        self._run(self.conn.close)
+        if self.executor:
+            self.executor.shutdown(wait=True)
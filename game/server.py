@@ -0,0 +1,206 @@
+"""One scheduler task for every game session in the process.
+
+In server mode each connected page gets a Session instead of its own
+FixedStepScheduler. Sessions are grouped into buckets by tick period; a
+single task sleeps until the next bucket is due and ticks all of its sessions
+together. Inactive sessions (paused or game over) leave their bucket, so
+they cost nothing until they are resumed.
+"""
+import asyncio
+from collections import deque
+
+
+class Bucket:
+    __slots__ = ("period", "deadline", "sessions")
+
+    def __init__(self, period, deadline):
+        self.period = period
+        self.deadline = deadline
+        self.sessions = []
+
+
+class Session:
+    """A game's handle on the shared scheduler, used like a FixedStepScheduler"""
+
+    __slots__ = ("server", "update", "render", "bucket", "active", "ticks", "done", "_period")
+
+    def __init__(self, server, period):
+        self.server = server
+        self.update = None
+        self.render = None
+        self.bucket = None
+        self.active = True
+        self.ticks = 0
+        self.done = None
+        self._period = server.snap(period)
+
+    @property
+    def period(self):
+        return self._period
+
+    @period.setter
+    def period(self, value):
+        # Snapped right away so the caller can read back the period it got
+        self._period = self.server.snap(value)
+        self.server.call(self.server._place, self)
+
+    async def run(self, update, render):
+        """Tick with the other sessions until stop()"""
+        self.update = update
+        self.render = render
+        self.done = asyncio.get_running_loop().create_future()
+        self.server._place(self)
+        await self.done
+
+    def set_active(self, active):
+        self.active = active
+        self.server.call(self.server._place, self)
+
+    def stop(self):
+        self.server.call(self.server._remove, self)
+
+    def stats(self):
+        return {"period": self._period, "ticks": self.ticks, "active": self.active}
+
+
+class SessionScheduler:
+    """Ticks many sessions from one task, batched by speed bucket.
+
+    Periods are snapped to multiples of granularity so that sessions with
+    nearly the same speed share a bucket. Missed deadlines are not caught
+    up; their time is folded into the next tick's dt instead.
+    """
+
+    def __init__(self, granularity=0.005, history=1000):
+        self.granularity = granularity
+        self.buckets = {}  # period step -> Bucket
+        self.sessions = set()
+        self.loop = None
+        self.task = None
+        self.wake = None
+        self.ticks = 0  # Bucket ticks
+        self.session_ticks = 0
+        self.dropped = 0
+        self.lag = deque(maxlen=history)  # Seconds late, per bucket tick
+
+    def snap(self, period):
+        return max(1, round(period / self.granularity)) * self.granularity
+
+    def session(self, period=0.08):
+        return Session(self, period)
+
+    def call(self, function, *args):
+        """Run function on the event loop thread; input handlers run in worker threads"""
+        if self.loop:
+            self.loop.call_soon_threadsafe(function, *args)
+
+    def _start(self):
+        if self.task is None:
+            self.loop = asyncio.get_running_loop()
+            self.wake = asyncio.Event()
+            self.task = self.loop.create_task(self._run())
+
+    def _unbucket(self, session):
+        bucket = session.bucket
+        if bucket:
+            bucket.sessions.remove(session)
+            if not bucket.sessions:
+                del self.buckets[round(bucket.period / self.granularity)]
+            session.bucket = None
+
+    def _place(self, session):
+        """Put a session in the bucket for its period, or in none while inactive"""
+        if session.done is None or session.done.done():
+            return
+        self._start()
+        self.sessions.add(session)
+        key = round(session.period / self.granularity)
+        target = self.buckets.get(key) if session.active else None
+        if session.bucket is not None and session.bucket is target:
+            return
+        self._unbucket(session)
+        if not session.active:
+            return
+        if target is None:
+            target = self.buckets[key] = Bucket(session.period, self.loop.time() + session.period)
+        target.sessions.append(session)
+        session.bucket = target
+        self.wake.set()
+
+    def _remove(self, session):
+        self._unbucket(session)
+        self.sessions.discard(session)
+        if session.done and not session.done.done():
+            session.done.set_result(None)
+
+    async def _run(self):
+        loop = self.loop
+        while True:
+            if not self.buckets:
+                self.wake.clear()
+                await self.wake.wait()
+                continue
+            bucket = min(self.buckets.values(), key=lambda b: b.deadline)
+            delay = bucket.deadline - loop.time()
+            if delay > 0:
+                # Wake up early when a session joins a bucket that is due sooner
+                self.wake.clear()
+                try:
+                    await asyncio.wait_for(self.wake.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            period = bucket.period
+            late = -delay
+            self.lag.append(late)
+            missed = int(late // period)
+            self.dropped += missed
+            bucket.deadline += (missed + 1) * period
+            dt = period * (1 + missed)
+
+            sessions = list(bucket.sessions)
+            for session in sessions:
+                self._tick(session, session.update, dt)
+                session.ticks += 1
+            for session in sessions:
+                self._tick(session, session.render)
+            self.ticks += 1
+            self.session_ticks += len(sessions)
+            # Let input handlers and page traffic run between buckets
+            await asyncio.sleep(0)
+
+    def _tick(self, session, function, *args):
+        if session.done.done():
+            return
+        try:
+            function(*args)
+        except Exception as e:
+            print(f"Error in game session: {e}")
+            self._remove(session)
+
+    def stats(self):
+        """Session counts and tick lag over the recent history"""
+        lag = self.lag
+        return {
+            "sessions": len(self.sessions),
+            "active": sum(len(bucket.sessions) for bucket in self.buckets.values()),
+            "buckets": len(self.buckets),
+            "ticks": self.ticks,
+            "session_ticks": self.session_ticks,
+            "dropped": self.dropped,
+            "last_lag": lag[-1] if lag else 0.0,
+            "mean_lag": sum(lag) / len(lag) if lag else 0.0,
+            "max_lag": max(lag) if lag else 0.0,
+        }
+
+    async def report(self, interval):
+        """Print stats() every interval seconds"""
+        while True:
+            await asyncio.sleep(interval)
+            stats = self.stats()
+            print(
+                f"{stats['sessions']} sessions, {stats['active']} active in {stats['buckets']} buckets, "
+                f"lag mean {stats['mean_lag'] * 1000:.1f} ms max {stats['max_lag'] * 1000:.1f} ms, "
+                f"{stats['dropped']} dropped ticks"
+            )
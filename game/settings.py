@@ -0,0 +1,91 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+
+from game.files import write_atomic
+
+
+class SettingsStore:
+    """Settings kept in memory and persisted with debounced, atomic writes.
+
+    Changes made within `delay` seconds of each other are written once, from
+    a worker thread, by writing a temporary file and renaming it over the
+    settings file so a crash never leaves a half-written file behind.
+    With no path the settings only live in memory.
+    """
+
+    def __init__(self, path, defaults, delay=0.5):
+        self.path = path
+        self.delay = delay
+        self.values = dict(defaults)
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()  # Keeps writes in order
+        self.dirty = False  # Changes not written yet
+        self.timer = None  # Pending debounced write
+        self.loop = asyncio.get_running_loop()
+        self.load()
+
+    def load(self):
+        """Load saved settings"""
+        if self.path is None:
+            return
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r') as f:
+                    self.values.update(json.load(f))
+        except Exception as e:
+            print(f"Error loading settings: {e}")
+
+    def __getitem__(self, key):
+        return self.values[key]
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def set(self, key, value):
+        """Change a setting and schedule a write"""
+        with self.lock:
+            self.values[key] = value
+            self.dirty = self.path is not None
+        if self.path is None:
+            return
+        # Slider handlers may run outside the event loop thread
+        self.loop.call_soon_threadsafe(self._schedule)
+
+    def _schedule(self):
+        if self.timer:
+            self.timer.cancel()
+        self.timer = self.loop.call_later(self.delay, self._start_write)
+
+    def _start_write(self):
+        self.timer = None
+        if sys.platform == "emscripten":
+            # No worker threads in the browser build
+            self._write()
+        else:
+            self.loop.run_in_executor(None, self._write)
+
+    def _write(self):
+        """Write the settings atomically (temp file + rename)"""
+        with self.write_lock:
+            self._write_locked()
+
+    def _write_locked(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            data = dict(self.values)
+            self.dirty = False
+        try:
+            write_atomic(self.path, json.dumps(data), prefix=".settings-")
+        except Exception as e:
+            print(f"Error saving settings: {e}")
+
+    def flush(self):
+        """Write any pending change now, e.g. on shutdown"""
+        if self.timer:
+            self.timer.cancel()
+            self.timer = None
+        self._write()
@@ -0,0 +1,193 @@
+"""Versioned binary snapshots of a game in progress.
+
+A snapshot holds everything SnakeEngine needs to carry on exactly where it
+stopped, RNG state included, so a restored game plays out the same as the
+original would have with the same inputs. Turns still waiting in the input
+queue are stored too.
+
+    header    magic, version, flags, grid size, seed, cell size, score, ticks,
+              elapsed, speed, rules, special food timers, directions, food
+    rng       625 x u32 Mersenne Twister state, f64 gauss_next
+    counts    u8 queued_count, u32 length, u32 growth (no growth in version 1)
+    queued    queued_count x u8 direction codes
+    body      length cells, head first
+    free      free-cell index in its current order (it decides food spawns)
+
+Cells are u16 on boards up to 256 x 256, u32 on larger ones.
+
+Usage: python -m game.snapshot info|play FILE...
+"""
+import os
+import struct
+import sys
+from array import array
+from collections import deque
+
+from game.engine import DIRECTIONS, SnakeEngine
+from game.files import write_atomic
+
+MAGIC = b"SNKS"
+VERSION = 2
+HEADER = struct.Struct("<4sBBHIBIIddddddBBI")
+COUNTS = struct.Struct("<BII")
+COUNTS_V1 = struct.Struct("<BI")
+RNG_STATE = struct.Struct("<625Id")
+NO_DIRECTION = 0xFF
+NO_FOOD = 0xFFFFFFFF
+
+# Flags
+GAME_OVER = 1
+WON = 2
+PAUSED = 4
+SPECIAL_FOOD = 8
+GAUSS_NEXT = 16
+
+
+def _direction_code(direction):
+    return DIRECTIONS.index(direction) if direction in DIRECTIONS else NO_DIRECTION
+
+
+def dumps(engine, queued=()):
+    """Serialize the engine state and the queued turns to bytes"""
+    cells = engine.grid_size * engine.grid_size
+    typecode = "H" if cells <= 0x10000 else "I"
+    version, mt, gauss_next = engine.rng.getstate()
+    flags = (
+        (GAME_OVER if engine.game_over else 0)
+        | (WON if engine.won else 0)
+        | (PAUSED if engine.paused else 0)
+        | (SPECIAL_FOOD if engine.food_type == "special" else 0)
+        | (GAUSS_NEXT if gauss_next is not None else 0)
+    )
+    header = HEADER.pack(
+        MAGIC, VERSION, flags, engine.grid_size, engine.seed,
+        array(typecode).itemsize,
+        engine.score, engine.ticks, engine.elapsed, engine.speed,
+        engine.special_food_chance, engine.special_food_duration,
+        engine.special_food_timer, engine.last_food_move,
+        _direction_code(engine.direction), _direction_code(engine.food_direction),
+        NO_FOOD if engine.food is None else engine.cell_index(engine.food),
+    )
+    body = array(typecode, [engine.cell_index(pos) for pos in engine.snake])
+    free = array(typecode, engine.free_cells)
+    return b"".join([
+        header,
+        RNG_STATE.pack(*mt, gauss_next or 0.0),
+        COUNTS.pack(len(queued), len(body), engine.growth),
+        bytes(_direction_code(direction) for direction in queued),
+        body.tobytes(),
+        free.tobytes(),
+    ])
+
+
+def restore(engine, data):
+    """Load a snapshot into an existing engine; returns the queued turns.
+
+    No events are emitted, listeners should redraw from the engine state.
+    """
+    (
+        magic, version, flags, grid_size, seed, itemsize,
+        score, ticks, elapsed, speed, chance, duration,
+        special_food_timer, last_food_move,
+        direction, food_direction, food,
+    ) = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a snake snapshot")
+    if version not in (1, VERSION):
+        raise ValueError(f"Unsupported snapshot version {version}")
+    if grid_size != engine.grid_size:
+        raise ValueError(f"Snapshot is for a {grid_size} x {grid_size} board")
+    pos = HEADER.size
+    *mt, gauss_next = RNG_STATE.unpack_from(data, pos)
+    pos += RNG_STATE.size
+    if version == 1:
+        (queued_count, length), growth = COUNTS_V1.unpack_from(data, pos), 0
+        pos += COUNTS_V1.size
+    else:
+        queued_count, length, growth = COUNTS.unpack_from(data, pos)
+        pos += COUNTS.size
+    queued = [DIRECTIONS[code] for code in data[pos:pos + queued_count]]
+    pos += queued_count
+
+    typecode = "H" if itemsize == 2 else "I"
+    body = array(typecode)
+    body.frombytes(data[pos:pos + length * itemsize])
+    pos += length * itemsize
+    free = array(typecode)
+    free.frombytes(data[pos:])
+
+    def position(cell):
+        return cell % grid_size, cell // grid_size
+
+    engine.seed = seed
+    engine.rng.setstate((3, tuple(mt), gauss_next if flags & GAUSS_NEXT else None))
+    engine.events = []
+    engine.snake = deque(position(cell) for cell in body)
+    engine.occupied = bytearray(grid_size * grid_size)
+    for cell in body:
+        engine.occupied[cell] = 1
+    engine.free_cells = array("I", free)
+    engine.free_slot = array("I", bytes(4 * grid_size * grid_size))
+    for slot, cell in enumerate(engine.free_cells):
+        engine.free_slot[cell] = slot
+    engine.direction = DIRECTIONS[direction]
+    engine.growth = growth
+    engine.food = None if food == NO_FOOD else position(food)
+    engine.food_type = "special" if flags & SPECIAL_FOOD else "normal"
+    engine.food_direction = (0, 0) if food_direction == NO_DIRECTION else DIRECTIONS[food_direction]
+    engine.special_food_timer = special_food_timer
+    engine.last_food_move = last_food_move
+    engine.score = score
+    engine.ticks = ticks
+    engine.elapsed = elapsed
+    engine.speed = speed
+    engine.special_food_chance = chance
+    engine.special_food_duration = duration
+    engine.game_over = bool(flags & GAME_OVER)
+    engine.won = bool(flags & WON)
+    engine.paused = bool(flags & PAUSED)
+    return queued
+
+
+def loads(data):
+    """A new engine in the saved state, and the queued turns"""
+    grid_size = HEADER.unpack_from(data)[3]
+    engine = SnakeEngine(grid_size, seed=0)
+    return engine, restore(engine, data)
+
+
+def save(path, engine, queued=()):
+    write(path, dumps(engine, queued))
+
+
+def write(path, data):
+    """Write snapshot bytes atomically"""
+    write_atomic(path, data, prefix=".snapshot-")
+
+
+def load(path):
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def main(argv):
+    if len(argv) < 2 or argv[0] not in ("info", "play"):
+        print(__doc__)
+        return 2
+    for path in argv[1:]:
+        engine, queued = load(path)
+        if argv[0] == "play":
+            # Let the autopilot finish the game from the saved position
+            from game.autopilot import play
+            engine.paused = False
+            play(engine)
+        print(
+            f"{os.path.basename(path)}: {engine.grid_size}x{engine.grid_size}, score {engine.score}, "
+            f"length {len(engine.snake)}, {engine.ticks} ticks, {len(queued)} queued turns"
+            + (", game over" if engine.game_over else "")
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
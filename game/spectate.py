@@ -0,0 +1,311 @@
+"""Live spectating: one game's ticks encoded once and fanned out to viewers.
+
+The Broadcaster turns every tick into a small binary delta (head added,
+tail removed, food changes, score) and puts the same bytes on each viewer's
+asyncio queue. A keyframe with the full state goes out every
+keyframe_interval ticks, to every new viewer and to any viewer whose queue
+overflowed; slow viewers lose frames instead of holding up the game.
+
+Frames, little-endian, cells are y * grid_size + x:
+
+    delta     'D' u32 tick, u32 score, u8 flags
+              [u32 head] [u32 tail] [u32 food, u8 food type]   (by flags)
+    keyframe  'K' u32 tick, u32 score, u8 flags, u16 grid size,
+              u32 food, u8 food type, u32 length, length x u32 cells (head first)
+
+Usage: python -m game.spectate [VIEWERS] [TICKS]   (in-process self check)
+"""
+import asyncio
+import struct
+import sys
+from collections import deque
+
+from game.engine import MOVED
+
+DELTA = ord("D")
+KEYFRAME = ord("K")
+DELTA_HEADER = struct.Struct("<BIIB")
+KEYFRAME_HEADER = struct.Struct("<BIIBHIBI")
+CELL = struct.Struct("<I")
+FOOD = struct.Struct("<IB")
+
+# Flags
+HAS_HEAD = 1
+HAS_TAIL = 2
+HAS_FOOD = 4
+GAME_OVER = 8
+WON = 16
+PAUSED = 32
+
+NO_FOOD = 0xFFFFFFFF
+FOOD_TYPES = {None: 0, "normal": 1, "special": 2}
+FOOD_TYPE_NAMES = {code: name for name, code in FOOD_TYPES.items()}
+
+
+class Viewer:
+    """One subscriber: a bounded queue of encoded frames"""
+
+    def __init__(self, broadcaster, queue_size):
+        self.broadcaster = broadcaster
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(queue_size)
+        self.needs_keyframe = True
+        self.received = 0
+        self.dropped = 0
+
+    async def get(self):
+        """The next frame, or None once the game is gone"""
+        return await self.queue.get()
+
+    def _end(self):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    def close(self):
+        self.broadcaster.unsubscribe(self)
+
+
+class Broadcaster:
+    """Publishes a game's ticks to any number of viewers.
+
+    Call end_tick() after every engine step, on the event loop thread. With
+    no viewers nothing is encoded.
+    """
+
+    def __init__(self, engine, keyframe_interval=50, queue_size=16):
+        self.engine = engine
+        self.keyframe_interval = keyframe_interval
+        self.queue_size = queue_size
+        self.viewers = []
+        self.tick = 0
+        self.head = None  # Cells changed since the last end_tick()
+        self.tail = None
+        self.moves = 0
+        self.sent_food = None
+        self.force_keyframe = False
+        self.frames = 0
+        self.bytes_sent = 0
+        engine.subscribe(self.on_engine_event)
+
+    def on_engine_event(self, kind, data):
+        if kind == MOVED:
+            head, tail = data
+            self.head = self.engine.cell_index(head)
+            self.tail = self.engine.cell_index(tail) if tail else None
+            self.moves += 1
+
+    def subscribe(self):
+        viewer = Viewer(self, self.queue_size)
+        self.viewers.append(viewer)
+        # The current state goes out right away instead of at the next keyframe
+        viewer.queue.put_nowait(self.keyframe())
+        viewer.needs_keyframe = False
+        return viewer
+
+    def unsubscribe(self, viewer):
+        if viewer in self.viewers:
+            self.viewers.remove(viewer)
+
+    def request_keyframe(self):
+        """Send a keyframe next tick, e.g. after a reset; safe from any thread"""
+        self.force_keyframe = True
+
+    def _flags(self):
+        engine = self.engine
+        return (
+            (GAME_OVER if engine.game_over else 0)
+            | (WON if engine.won else 0)
+            | (PAUSED if engine.paused else 0)
+        )
+
+    def _food(self):
+        engine = self.engine
+        if engine.food is None:
+            return NO_FOOD, FOOD_TYPES[None]
+        return engine.cell_index(engine.food), FOOD_TYPES[engine.food_type]
+
+    def keyframe(self):
+        engine = self.engine
+        food, food_type = self._food()
+        cells = [engine.cell_index(pos) for pos in engine.snake]
+        return (
+            KEYFRAME_HEADER.pack(
+                KEYFRAME, self.tick, engine.score, self._flags(), engine.grid_size, food, food_type, len(cells)
+            )
+            + struct.pack(f"<{len(cells)}I", *cells)
+        )
+
+    def delta(self):
+        flags = self._flags()
+        parts = []
+        if self.head is not None:
+            flags |= HAS_HEAD
+            parts.append(CELL.pack(self.head))
+        if self.tail is not None:
+            flags |= HAS_TAIL
+            parts.append(CELL.pack(self.tail))
+        food = self._food()
+        if food != self.sent_food:
+            flags |= HAS_FOOD
+            parts.append(FOOD.pack(*food))
+        return DELTA_HEADER.pack(DELTA, self.tick, self.engine.score, flags) + b"".join(parts)
+
+    def end_tick(self):
+        """Encode this tick once and queue it for every viewer"""
+        self.tick += 1
+        if self.viewers:
+            keyframe_due = self.force_keyframe or self.moves > 1 or self.tick % self.keyframe_interval == 0
+            delta = None if keyframe_due else self.delta()
+            keyframe = None
+            for viewer in self.viewers:
+                if keyframe_due or viewer.needs_keyframe:
+                    keyframe = keyframe or self.keyframe()
+                    frame = keyframe
+                else:
+                    frame = delta
+                if viewer.queue.full():
+                    # Too slow: skip frames until there is room for a keyframe
+                    viewer.dropped += 1
+                    viewer.needs_keyframe = True
+                    continue
+                viewer.queue.put_nowait(frame)
+                viewer.needs_keyframe = False
+                viewer.received += 1
+                self.frames += 1
+                self.bytes_sent += len(frame)
+            self.force_keyframe = False
+        self.sent_food = self._food()
+        self.head = self.tail = None
+        self.moves = 0
+
+    def close(self):
+        """Stop publishing; viewers get None. May be called from any thread"""
+        self.engine.unsubscribe(self.on_engine_event)
+        for viewer in self.viewers:
+            viewer.loop.call_soon_threadsafe(viewer._end)
+        self.viewers = []
+
+
+class SpectatorState:
+    """A viewer's copy of the game, rebuilt from frames"""
+
+    def __init__(self):
+        self.grid_size = None
+        self.tick = None
+        self.score = 0
+        self.flags = 0
+        self.snake = deque()  # Positions, head first
+        self.food = None
+        self.food_type = None
+
+    def position(self, cell):
+        return cell % self.grid_size, cell // self.grid_size
+
+    def apply(self, frame):
+        """Apply a frame; returns (is_keyframe, new_head, tail) with positions or None"""
+        if frame[0] == KEYFRAME:
+            _, self.tick, self.score, self.flags, self.grid_size, food, food_type, length = (
+                KEYFRAME_HEADER.unpack_from(frame)
+            )
+            cells = struct.unpack_from(f"<{length}I", frame, KEYFRAME_HEADER.size)
+            self.snake = deque(self.position(cell) for cell in cells)
+            self._set_food(food, food_type)
+            return True, None, None
+
+        if self.grid_size is None:
+            raise ValueError("Delta before the first keyframe")
+        _, self.tick, self.score, self.flags = DELTA_HEADER.unpack_from(frame)
+        pos = DELTA_HEADER.size
+        head = tail = None
+        if self.flags & HAS_HEAD:
+            head = self.position(CELL.unpack_from(frame, pos)[0])
+            pos += CELL.size
+            self.snake.appendleft(head)
+        if self.flags & HAS_TAIL:
+            tail = self.position(CELL.unpack_from(frame, pos)[0])
+            pos += CELL.size
+            self.snake.pop()
+        if self.flags & HAS_FOOD:
+            self._set_food(*FOOD.unpack_from(frame, pos))
+        return False, head, tail
+
+    def _set_food(self, food, food_type):
+        self.food = None if food == NO_FOOD else self.position(food)
+        self.food_type = FOOD_TYPE_NAMES[food_type]
+
+    @property
+    def game_over(self):
+        return bool(self.flags & GAME_OVER)
+
+
+async def watch(broadcaster, renderer, updates=None, on_frame=None):
+    """Mirror a broadcast game on a BoardRenderer until the game or the task ends.
+
+    With an UpdateBatcher as updates, each frame (plus whatever on_frame(state)
+    changes) is sent in one round-trip.
+    """
+    viewer = broadcaster.subscribe()
+    state = SpectatorState()
+    try:
+        while True:
+            frame = await viewer.get()
+            if frame is None:
+                break
+            if updates:
+                updates.begin()
+            is_keyframe, head, tail = state.apply(frame)
+            if is_keyframe:
+                renderer.reset(state.snake)
+            elif head:
+                renderer.move_snake(head, tail)
+            renderer.draw_food(state.food, state.food_type, 1)
+            renderer.flush()
+            if on_frame:
+                on_frame(state)
+            if updates:
+                updates.flush()
+    finally:
+        viewer.close()
+
+
+async def self_check(viewers=100, ticks=2000, slow_every=10):
+    """Play an autopilot game with in-process viewers and check their copies"""
+    from game.autopilot import Autopilot
+    from game.engine import SnakeEngine
+
+    engine = SnakeEngine(20, seed=1)
+    autopilot = Autopilot(20)
+    broadcaster = Broadcaster(engine, queue_size=8)
+    subscribers = [broadcaster.subscribe() for _ in range(viewers)]
+    states = [SpectatorState() for _ in subscribers]
+    mismatches = 0
+    for tick in range(ticks):
+        if engine.game_over:
+            engine.reset()
+            broadcaster.request_keyframe()
+        engine.step(autopilot.choose(engine))
+        broadcaster.end_tick()
+        for i, (viewer, state) in enumerate(zip(subscribers, states)):
+            # Every slow_every-th viewer only reads every 20th tick and falls behind
+            if i % slow_every == 0 and tick % 20:
+                continue
+            while not viewer.queue.empty():
+                state.apply(viewer.queue.get_nowait())
+            if viewer.needs_keyframe:
+                continue  # Catches up with the next keyframe
+            if list(state.snake) != list(engine.snake) or state.food != engine.food or state.score != engine.score:
+                mismatches += 1
+        await asyncio.sleep(0)
+    dropped = sum(viewer.dropped for viewer in subscribers)
+    print(
+        f"{viewers} viewers, {ticks} ticks: {broadcaster.frames} frames, "
+        f"{broadcaster.bytes_sent / max(1, broadcaster.frames):.1f} bytes/frame, "
+        f"{dropped} dropped, {mismatches} mismatches"
+    )
+    return mismatches
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    sys.exit(1 if asyncio.run(self_check(*args)) else 0)
@@ -0,0 +1,89 @@
+"""Opt-in startup timeline.
+
+Import this module before anything else so its clock starts with the app.
+Phases and marks are always recorded (a handful of timestamps); the timeline
+is only written when SNAKE_STARTUP_TRACE=path is set or main.py is started
+with --startup-trace path. The file uses the Chrome trace event format, so it
+opens in chrome://tracing or https://ui.perfetto.dev as well as in scripts.
+
+A server hosts many sessions in one process; only the first one to claim()
+the trace records into it, the others get a disabled StartupTrace.
+"""
+import json
+import os
+import threading
+import time
+
+
+class StartupTrace:
+    def __init__(self, path=None, enabled=True):
+        self.origin = time.perf_counter()
+        self.path = path if enabled else None
+        self.enabled = enabled
+        self.events = []
+        self.marks = {}
+        self.last_lap = 0.0
+        self.reported = not enabled  # Time to first frame printed
+        self.claimed = False
+        self.lock = threading.Lock()
+
+    def claim(self):
+        """True for the first caller only"""
+        with self.lock:
+            claimed, self.claimed = self.claimed, True
+        return not claimed
+
+    def elapsed(self):
+        return time.perf_counter() - self.origin
+
+    def _event(self, name, phase, start, duration=None):
+        if not self.enabled:
+            return
+        event = {
+            "name": name,
+            "ph": phase,
+            "ts": round(start * 1e6),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        if duration is not None:
+            event["dur"] = round(duration * 1e6)
+        with self.lock:
+            self.events.append(event)
+
+    def span(self, name, start, end=None):
+        """Record a phase that ran from start (seconds since origin) until end or now"""
+        end = self.elapsed() if end is None else end
+        self._event(name, "X", start, end - start)
+
+    def lap(self, name):
+        """Record a phase that ran since the previous lap (or the origin)"""
+        now = self.elapsed()
+        self.span(name, self.last_lap, now)
+        self.last_lap = now
+
+    def mark(self, name):
+        """Record the first time something happened, returns seconds since origin"""
+        if name not in self.marks:
+            self.marks[name] = self.elapsed()
+            self._event(name, "i", self.marks[name])
+        return self.marks[name]
+
+    def write(self):
+        """Write the timeline so far, if tracing is enabled"""
+        if not self.path:
+            return
+        try:
+            with self.lock:
+                data = {
+                    "traceEvents": sorted(self.events, key=lambda event: event["ts"]),
+                    "displayTimeUnit": "ms",
+                    "marks": {name: round(t * 1000, 3) for name, t in self.marks.items()},
+                }
+            with open(self.path, "w") as f:
+                json.dump(data, f, indent=1)
+        except Exception as e:
+            print(f"Error writing startup trace: {e}")
+
+
+startup = StartupTrace(os.environ.get("SNAKE_STARTUP_TRACE"))
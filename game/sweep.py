@@ -0,0 +1,179 @@
+"""Headless parameter sweeps and strategy tournaments.
+
+Every combination of the swept settings is played --games times by each
+strategy across a process pool. Results are appended to a CSV file as games
+finish; rerunning the same command resumes and skips finished games. Job
+ids include --seed and --max-ticks, so changing either plays new games.
+
+    python main.py sweep --grid-sizes 20,40 --strategies autopilot,greedy --games 200
+"""
+import argparse
+import csv
+import itertools
+import os
+import random
+import statistics
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from game.autopilot import Autopilot, play
+from game.engine import DIRECTIONS, SnakeEngine
+
+FIELDS = [
+    "job", "strategy", "grid_size", "speed", "special_food_chance", "special_food_duration",
+    "game", "seed", "score", "length", "ticks", "won",
+]
+CONFIG_FIELDS = FIELDS[1:6]
+
+
+def random_strategy(grid_size, rng):
+    def choose(engine):
+        return rng.choice(DIRECTIONS) if rng.random() < 0.2 else None
+    return choose
+
+
+def greedy_strategy(grid_size, rng):
+    """Step toward the food along the shorter way around, avoiding the body"""
+    def choose(engine):
+        head = engine.snake[0]
+        reverse = (-engine.direction[0], -engine.direction[1])
+        best, best_distance = None, None
+        for direction in DIRECTIONS:
+            if direction == reverse:
+                continue
+            x = (head[0] + direction[0]) % grid_size
+            y = (head[1] + direction[1]) % grid_size
+            if engine.is_occupied((x, y)):
+                continue
+            dx = abs(x - engine.food[0]) if engine.food else 0
+            dy = abs(y - engine.food[1]) if engine.food else 0
+            distance = min(dx, grid_size - dx) + min(dy, grid_size - dy)
+            if best is None or distance < best_distance:
+                best, best_distance = direction, distance
+        return best
+    return choose
+
+
+STRATEGIES = {
+    "autopilot": lambda grid_size, rng: Autopilot(grid_size).choose,
+    "greedy": greedy_strategy,
+    "random": random_strategy,
+}
+
+
+def job_seed(base_seed, job):
+    """Reproducible per-job seed, independent of scheduling order"""
+    return random.Random(f"{base_seed}:{job}").getrandbits(32)
+
+
+def run_job(job, strategy, grid_size, speed, chance, duration, game, seed, max_ticks):
+    engine = SnakeEngine(
+        grid_size, seed=seed, speed=speed,
+        special_food_chance=chance, special_food_duration=duration,
+    )
+    if strategy == "autopilot":
+        play(engine, Autopilot(grid_size), max_ticks=max_ticks)
+    else:
+        choose = STRATEGIES[strategy](grid_size, random.Random(seed))
+        while not engine.game_over and engine.ticks < max_ticks:
+            engine.step(choose(engine))
+    return {
+        "job": job, "strategy": strategy, "grid_size": grid_size, "speed": speed,
+        "special_food_chance": chance, "special_food_duration": duration,
+        "game": game, "seed": seed, "score": engine.score, "length": len(engine.snake),
+        "ticks": engine.ticks, "won": int(engine.won),
+    }
+
+
+def parse_list(text, cast):
+    return [cast(value) for value in text.split(",") if value]
+
+
+def completed_jobs(path):
+    if not os.path.exists(path):
+        return set()
+    with open(path, newline="") as f:
+        return {row["job"] for row in csv.DictReader(f)}
+
+
+def summarize(path, run=""):
+    """Print aggregate statistics per configuration and strategy for the jobs of one run"""
+    groups = {}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            if not row["job"].startswith(run):
+                continue
+            groups.setdefault(tuple(row[field] for field in CONFIG_FIELDS), []).append(row)
+    print(f"{'strategy':>10} {'grid':>5} {'speed':>6} {'chance':>7} {'dur':>5} "
+          f"{'games':>6} {'mean':>8} {'median':>8} {'max':>6} {'len':>7} {'ticks':>8} {'wins':>5}")
+    for key in sorted(groups):
+        rows = groups[key]
+        scores = [int(row["score"]) for row in rows]
+        print(
+            f"{key[0]:>10} {key[1]:>5} {key[2]:>6} {key[3]:>7} {key[4]:>5} {len(rows):>6} "
+            f"{statistics.mean(scores):>8.1f} {statistics.median(scores):>8.1f} {max(scores):>6} "
+            f"{statistics.mean(int(row['length']) for row in rows):>7.1f} "
+            f"{statistics.mean(int(row['ticks']) for row in rows):>8.0f} "
+            f"{sum(int(row['won']) for row in rows):>5}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="main.py sweep", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--grid-sizes", default="20")
+    parser.add_argument("--speeds", default="0.08", help="tick lengths in seconds, e.g. MAX_SPEED,MIN_SPEED")
+    parser.add_argument("--special-chances", default="0.05")
+    parser.add_argument("--special-durations", default="4")
+    parser.add_argument("--strategies", default="autopilot", help=",".join(STRATEGIES))
+    parser.add_argument("--games", type=int, default=100, help="games per configuration and strategy")
+    parser.add_argument("--max-ticks", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--output", default="sweep.csv")
+    args = parser.parse_args(argv)
+
+    configs = itertools.product(
+        parse_list(args.strategies, str),
+        parse_list(args.grid_sizes, int),
+        parse_list(args.speeds, float),
+        parse_list(args.special_chances, float),
+        parse_list(args.special_durations, float),
+    )
+    # Games played with another --seed or --max-ticks are different jobs
+    run = f"{args.seed}/{args.max_ticks}/"
+    done = completed_jobs(args.output)
+    jobs = []
+    skipped = 0
+    for strategy, grid_size, speed, chance, duration in configs:
+        if strategy not in STRATEGIES:
+            parser.error(f"unknown strategy {strategy}")
+        for game in range(args.games):
+            key = f"{strategy}/{grid_size}/{speed}/{chance}/{duration}/{game}"
+            if run + key in done:
+                skipped += 1
+            else:
+                jobs.append((run + key, strategy, grid_size, speed, chance, duration, game,
+                             job_seed(args.seed, key), args.max_ticks))
+    print(f"{len(jobs)} games to play, {skipped} already done", flush=True)
+
+    new_file = not os.path.exists(args.output)
+    with open(args.output, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        if new_file:
+            writer.writeheader()
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = [pool.submit(run_job, *job) for job in jobs]
+            for finished, future in enumerate(as_completed(futures), 1):
+                writer.writerow(future.result())
+                f.flush()
+                if finished % 100 == 0:
+                    print(f"{finished}/{len(jobs)} games", flush=True)
+
+    summarize(args.output, run)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
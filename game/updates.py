@@ -0,0 +1,74 @@
+import threading
+from contextlib import contextmanager
+
+
+class UpdateBatcher:
+    """Coalesces control updates into a single page.update() per tick.
+
+    Use it in place of page.update(): outside a batch updates are sent right
+    away, inside one the controls are only marked dirty and sent together by
+    flush(). Calling update() without controls marks the whole page.
+
+    Sync flet handlers call update() from worker threads while the game loop
+    batches, so the state is guarded by a lock: an update arriving during a
+    batch joins it, and only flush() ends a batch.
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self.dirty = {}  # Controls waiting for the next flush (ordered set)
+        self.batching = False
+        self.requested = 0  # update() calls received
+        self.flushed = 0  # page.update() calls made
+        self.last_size = 0  # Controls sent by the last flush
+        self.lock = threading.Lock()
+
+    def update(self, *controls):
+        with self.lock:
+            self.requested += 1
+            if not controls:
+                controls = (self.page,)
+            for control in controls:
+                self.dirty[control] = None
+            if not self.batching:
+                self._send()
+
+    def begin(self):
+        """Start collecting updates until the next flush()"""
+        with self.lock:
+            self.batching = True
+
+    def flush(self):
+        """Send every dirty control in one round-trip"""
+        with self.lock:
+            self.batching = False
+            self._send()
+
+    def _send(self):
+        self.last_size = len(self.dirty)
+        if not self.dirty:
+            return
+        controls = list(self.dirty)
+        self.dirty.clear()
+        self.flushed += 1
+        if self.page in controls:
+            # A full page update already covers every other control
+            self.page.update()
+        else:
+            self.page.update(*controls)
+
+    @contextmanager
+    def batch(self):
+        self.begin()
+        try:
+            yield self
+        finally:
+            self.flush()
+
+    @property
+    def coalesced(self):
+        """Number of update requests saved by batching"""
+        return self.requested - self.flushed
+
+    def stats(self):
+        return {"requested": self.requested, "flushed": self.flushed, "coalesced": self.coalesced}
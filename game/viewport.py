@@ -0,0 +1,105 @@
+import flet as ft
+from assets.styles.styles import *
+from assets.styles.cells import *
+from game.renderer import BoardRenderer
+
+
+class ViewportRenderer(BoardRenderer):
+    """Board renderer showing a GRID_SIZE x GRID_SIZE window of a larger world.
+
+    The camera keeps the snake's head in the middle of the board, wrapping
+    around the torus. There is one control per visible cell, created once;
+    scrolling restyles the cells whose content changed, so the widget count
+    does not depend on the world or snake size.
+
+    The snake is tracked in a bytearray of the whole world, fed by the same
+    reset/move_snake calls as BoardRenderer, and culling only reads it for
+    the visible cells.
+    """
+
+    def __init__(self, page, world_size=WORLD_SIZE):
+        self.page = page
+        self.world_size = world_size
+        self.world = bytearray(world_size * world_size)  # 1 where the snake is, indexed y * world_size + x
+        self.cells = [
+            ft.Container(
+                width=CELL_SIZE,
+                height=CELL_SIZE,
+                left=CELL_OFFSETS[x],
+                top=CELL_OFFSETS[y],
+                border_radius=CELL_BORDER_RADIUS,
+                **EMPTY_CELL_STYLE,
+            )
+            for y in range(GRID_SIZE)
+            for x in range(GRID_SIZE)
+        ]
+        self.control = ft.Stack(self.cells)
+        self.styles = {cell: EMPTY_CELL_STYLE for cell in self.cells}
+        self.head = None
+        self.drawn_food = None
+        self.drawn_food_style = None
+        self.changed = False  # The world changed since the last frame
+        self.dirty = {}
+
+    def reset(self, snake):
+        self.world = bytearray(self.world_size * self.world_size)
+        for pos in snake:
+            self.world[pos[1] * self.world_size + pos[0]] = 1
+        self.head = snake[0] if snake else None
+        self.changed = True
+
+    def move_snake(self, new_head, tail=None):
+        if tail is not None:
+            self.world[tail[1] * self.world_size + tail[0]] = 0
+        self.world[new_head[1] * self.world_size + new_head[0]] = 1
+        self.head = new_head
+        self.changed = True
+
+    def _draw_food(self, food, style):
+        self.changed = True
+
+    def camera(self):
+        """World position of the top left visible cell"""
+        half = GRID_SIZE // 2
+        return (self.head[0] - half) % self.world_size, (self.head[1] - half) % self.world_size
+
+    def _draw_view(self):
+        """Restyle the visible cells whose content differs from the last frame"""
+        size = self.world_size
+        world = self.world
+        left, top = self.camera()
+        head_slot = (GRID_SIZE // 2) * GRID_SIZE + GRID_SIZE // 2
+        food_slot = -1
+        if self.drawn_food is not None:
+            dx = (self.drawn_food[0] - left) % size
+            dy = (self.drawn_food[1] - top) % size
+            if dx < GRID_SIZE and dy < GRID_SIZE:
+                food_slot = dy * GRID_SIZE + dx
+
+        slot = 0
+        for row in range(GRID_SIZE):
+            y = top + row
+            if y >= size:
+                y -= size
+            base = y * size
+            for column in range(GRID_SIZE):
+                x = left + column
+                if x >= size:
+                    x -= size
+                if slot == head_slot:
+                    style = HEAD_CELL_STYLE
+                elif world[base + x]:
+                    style = BODY_CELL_STYLE
+                elif slot == food_slot:
+                    style = self.drawn_food_style
+                else:
+                    style = EMPTY_CELL_STYLE
+                self._style(self.cells[slot], style)
+                slot += 1
+
+    def flush(self):
+        """Cull the world to the camera, then send only the changed cells"""
+        if self.changed and self.head is not None:
+            self.changed = False
+            self._draw_view()
+        super().flush()
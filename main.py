@@ -1,20 +1,69 @@
+# Imported first so the startup clock includes the other imports
+from game.startup import StartupTrace, startup
 import flet as ft
 from flet import BoxShadow, Offset
-import random
 import asyncio
-import json
 import os
+import sys
+import threading
+import time
 from datetime import datetime
 from assets.styles.styles import *
+from game.audio import LazyAudio, sound_path
+from game.autopilot import Autopilot
+from game.engine import SnakeEngine, ATE, GAME_OVER, MOVED, PAUSED, RESUMED
+from game.input import InputQueue
+from game.metrics import Metrics
+from game.music import MusicController
+from game.renderer import BoardRenderer
+from game.replay import ReplayRecorder
+from game.canvas_renderer import CanvasRenderer
+from game.scheduler import FixedStepScheduler
+from game.scores import ScoreStore
+from game.server import SessionScheduler
+from game.settings import SettingsStore
+from game import snapshot
+from game.spectate import Broadcaster, watch
+from game.updates import UpdateBatcher
+from game.viewport import ViewportRenderer
 from appdirs import user_data_dir
 
+startup.lap("imports")
+
+ARROW_DIRECTIONS = {
+    "Arrow Left": (-1, 0),
+    "Arrow Right": (1, 0),
+    "Arrow Up": (0, -1),
+    "Arrow Down": (0, 1),
+}
+
+
+def create_renderer(page):
+    """The board renderer for the configured world size and SNAKE_RENDERER"""
+    if WORLD_SIZE > GRID_SIZE:
+        return ViewportRenderer(page)
+    if RENDERER == "canvas":
+        return CanvasRenderer(page)
+    return BoardRenderer(page)
+
+DEFAULT_SETTINGS = {'speed': 50, 'volume': 50}
+
+def app_data_dir():
+    path = user_data_dir("SnakeGame", "Hahelui")
+    os.makedirs(path, exist_ok=True)
+    return path
+
 class SnakeGame:
-    def __init__(self, page: ft.Page):
+    def __init__(self, page: ft.Page, scheduler=None, autosave=True, scores=None, settings=None, record=True):
+        # In server mode only the first session is traced
+        self.startup = startup if startup.claim() else StartupTrace(enabled=False)
+        self.startup.lap("flet session")
+        
         # Create app data directory
-        self.app_data_dir = user_data_dir("SnakeGame", "Hahelui")
-        os.makedirs(self.app_data_dir, exist_ok=True)
+        self.app_data_dir = app_data_dir()
         
         self.page = page
+        self.loop = asyncio.get_running_loop()
         self.page.title = "Snake Game Flet - By: @Hahelui"
         self.page.window_width = BOARD_SIZE + 200
         self.page.window_height = BOARD_SIZE + 300
@@ -22,59 +71,100 @@ class SnakeGame:
         self.page.padding = 0
         self.page.bgcolor = BACKGROUND_COLOR
         
-        # Audio setup
-        base_path = os.path.dirname(os.path.abspath(__file__))
-        self.eat_sound = ft.Audio(src=os.path.join(base_path, "assets/sounds/eat.wav"))
-        self.music = ft.Audio(
-            src=os.path.join(base_path, "assets/sounds/music.wav"),
-            autoplay=True,
-            release_mode=ft.audio.ReleaseMode.LOOP
+        # All UI updates go through the batcher, one round-trip per tick
+        self.updates = UpdateBatcher(self.page)
+        self.startup.lap("page setup")
+        
+        # Audio setup: only the eat sound is loaded up front, the music starts
+        # once the board is on screen and the rest loads on first use
+        self.eat_sound = ft.Audio(src=sound_path("eat"))
+        self.page.overlay.append(self.eat_sound)
+        self.music = LazyAudio(
+            self.page,
+            sound_path("music"),
+            updates=self.updates,
+            release_mode=ft.audio.ReleaseMode.LOOP,
+            on_loaded=self.on_music_loaded,
         )
-        self.music2 = ft.Audio(
-            src=os.path.join(base_path, "assets/sounds/music2.wav"),
-            release_mode=ft.audio.ReleaseMode.LOOP
+        self.music2 = LazyAudio(
+            self.page,
+            sound_path("music2"),
+            updates=self.updates,
+            release_mode=ft.audio.ReleaseMode.LOOP,
         )
-        self.pause_sound = ft.Audio(src=os.path.join(base_path, "assets/sounds/pause.wav"))
-        self.page.overlay.extend([self.eat_sound, self.music, self.music2, self.pause_sound])
+        self.pause_sound = LazyAudio(self.page, sound_path("pause"), updates=self.updates)
+        self.startup.lap("audio")
         
         # Game settings
-        self.queued_direction = None
-        self.paused = False
-        self.special_food_timer = 0
-        self.special_food_duration = 4
+        self.inputs = InputQueue()
         self.show_scores_card = False
-        self.last_food_move = 0  # Track last food movement time
         
         # High scores
         self.high_scores_file = os.path.join(self.app_data_dir, "high_scores.json")
         self.settings_file = os.path.join(self.app_data_dir, "settings.json")
-        self.high_scores = self.load_high_scores()
-        self.load_settings()
+        # Replays are optional on a server, where they would pile up
+        self.replays_dir = os.path.join(self.app_data_dir, "replays") if record else None
+        # Players sharing a server would share the file, so they get none
+        self.autosave_file = os.path.join(self.app_data_dir, "autosave.snks") if autosave else None
+        self.autosave_lock = threading.Lock()
+        self.autosave_count = 0  # Snapshots taken
+        self.autosave_written = 0  # Newest snapshot on disk
+        if self.replays_dir:
+            os.makedirs(self.replays_dir, exist_ok=True)
+        self.recorder = None
+        # A server passes its shared score store and in-memory settings
+        self.owns_scores = scores is None
+        self.scores = scores or ScoreStore(
+            os.path.join(self.app_data_dir, "scores.db"),
+            legacy_json=self.high_scores_file,
+        )
+        self.settings = settings or SettingsStore(self.settings_file, DEFAULT_SETTINGS)
+        self.startup.lap("scores and settings")
+        
+        # Initialize game state
+        self.engine = SnakeEngine(WORLD_SIZE)
+        self.engine.subscribe(self.on_engine_event)
+        self.broadcaster = Broadcaster(self.engine)
+        # In server mode all games share one scheduler task
+        self.scheduler = scheduler or FixedStepScheduler(DEFAULT_SPEED)
+        self.autopilot = None  # Built on first use, its buffers grow with the world
+        self.autopilot_enabled = False
+        self.running = True
         
         # Set initial game speed from saved settings
-        speed_pct = self.saved_speed_value
+        speed_pct = self.settings['speed']
         self.speed = MIN_SPEED - (speed_pct / 100) * (MIN_SPEED - MAX_SPEED)
         self.speed = max(MAX_SPEED, min(MIN_SPEED, self.speed))
         
-        # Initialize game state
-        self.snake = [(GRID_SIZE // 2, GRID_SIZE // 2)]
-        self.direction = (1, 0)
-        self.score = 0
-        self.game_over = False
-        self.food = None
-        self.food_type = "normal"
-        self.food_direction = (0, 0)  # Direction for special food movement
-        self.running = True
+        # Continue the game that was running when the app was last closed
+        self.restored = self.restore_autosave()
+        self.last_autosave = self.engine.elapsed
         
-        # Start background music loop
-        asyncio.create_task(self.loop_background_music())
+        # Background music follows the engine's food type and pause state
+        self.music_controller = MusicController(
+            self.engine, {"normal": self.music, "special": self.music2}
+        )
+        self.startup.lap("engine")
         
         # Calculate initial slider value based on default speed
         initial_speed_pct = (MIN_SPEED - DEFAULT_SPEED) / (MIN_SPEED - MAX_SPEED) * 100
         
+        # Frame metrics, measured only while the HUD is shown or SNAKE_METRICS is set
+        self.metrics = Metrics()
+        self.metrics.add_source("scheduler", self.scheduler.stats)
+        self.metrics.add_source("input", self.inputs.stats)
+        self.metrics.add_source("updates", self.updates.stats)
+        self.metrics_file = os.environ.get("SNAKE_METRICS")
+        self.metrics.enabled = bool(self.metrics_file)
+        self.metrics_next_write = 0
+        self.hud = ft.Text("", **HUD_TEXT_STYLE)
+        self.hud_container = ft.Container(content=self.hud, visible=False, **HUD_CONTAINER_STYLE)
+        self.hud_next_refresh = 0
+        
         # Create game board
+        self.renderer = create_renderer(self.updates)
         self.board = ft.Container(
-            content=ft.Stack([]),
+            content=self.renderer.control,
             width=BOARD_SIZE,
             height=BOARD_SIZE,
             bgcolor=BACKGROUND_COLOR,
@@ -91,7 +181,7 @@ class SnakeGame:
         
         # Score display with animation
         self.score_text = ft.Text(
-            f"Score: {self.score}",
+            f"Score: {self.engine.score}",
             **SCORE_STYLE,
             animate_scale=SCORE_ANIMATION,
         )
@@ -150,7 +240,7 @@ class SnakeGame:
         self.speed_slider = ft.Slider(
             min=0,
             max=100,
-            value=self.saved_speed_value,  # Use saved speed
+            value=self.settings['speed'],  # Use saved speed
             on_change=self.update_speed,
             width=150,
         )
@@ -160,13 +250,13 @@ class SnakeGame:
         self.volume_slider = ft.Slider(
             min=0,
             max=100,
-            value=self.saved_volume_value,  # Use saved volume
+            value=self.settings['volume'],  # Use saved volume
             on_change=self.update_volume,
             width=150,
         )
         # Set initial volume
-        self.music.volume = self.saved_volume_value / 100
-        self.music2.volume = self.saved_volume_value / 100
+        self.music.volume = self.settings['volume'] / 100
+        self.music2.volume = self.settings['volume'] / 100
         
         # Create a row for the pause menu buttons
         scores_button = ft.IconButton(
@@ -197,7 +287,7 @@ class SnakeGame:
                 alignment=ft.MainAxisAlignment.CENTER,
                 spacing=20,
             ),
-            visible=False,
+            visible=self.paused,
         )
         
         # Set page as focused control
@@ -206,7 +296,7 @@ class SnakeGame:
         # Game status text (Paused/Game Over)
         self.status_text = ft.Text(
             "PAUSED",
-            visible=False,
+            visible=self.paused,
             color=GAME_OVER_COLOR,
             size=24,
             weight="bold",
@@ -229,6 +319,7 @@ class SnakeGame:
         # Controls text
         movement_controls = self.create_key_text("↑/W, ↓/S, ←/A, →/D")
         space_control = self.create_key_text("SPACE")
+        autopilot_control = self.create_key_text("O")
         
         controls_text = ft.Row(
             [
@@ -237,10 +328,15 @@ class SnakeGame:
                 ft.Text(" | ", **CONTROLS_STYLE),
                 ft.Text("Pause/Restart: ", **CONTROLS_STYLE),
                 space_control,
+                ft.Text(" | ", **CONTROLS_STYLE),
+                ft.Text("Autopilot: ", **CONTROLS_STYLE),
+                autopilot_control,
             ],
             alignment=ft.MainAxisAlignment.CENTER,
         )
         
+        self.startup.lap("controls")
+        
         # Layout
         self.page.add(
             ft.Container(
@@ -270,6 +366,7 @@ class SnakeGame:
                             content=ft.Stack(
                                 [
                                     self.board,
+                                    self.hud_container,
                                     self.scores_card,
                                     ft.Container(
                                         content=self.status_text,
@@ -301,12 +398,28 @@ class SnakeGame:
                 alignment=ft.alignment.top_center,
             )
         )
+        self.startup.mark("first page.update")
+        self.startup.lap("layout")
         
         # Key event handler
         self.page.on_keyboard_event = self.handle_keyboard_event
         
+        # Closing the page stops the loop and the music
+        self.page.on_close = lambda _: self.close()
+        
         # Start game
-        self.spawn_food()
+        self.renderer.reset(self.engine.snake)
+        if self.restored:
+            # The restored game waits paused, send the board before that
+            self.redraw_board()
+        else:
+            # A replay has to start from the beginning of a game
+            self.start_recording()
+        if self.paused:
+            self.scheduler.set_active(False)
+        else:
+            self.music_controller.start()
+        self.startup.lap("start game")
     
     def create_key_text(self, text):
         return ft.Container(
@@ -314,99 +427,82 @@ class SnakeGame:
             **KEY_CONTAINER_STYLE
         )
     
+    @property
+    def paused(self):
+        return self.engine.paused
+    
+    @property
+    def speed(self):
+        return self.engine.speed
+    
+    @speed.setter
+    def speed(self, value):
+        # The scheduler may round the period, the engine follows it
+        self.scheduler.period = value
+        self.engine.speed = self.scheduler.period
+    
     def update_speed(self, e):
         """Update game speed based on slider value"""
         speed_pct = e.control.value
         self.speed = MIN_SPEED - (speed_pct / 100) * (MIN_SPEED - MAX_SPEED)
         self.speed = max(MAX_SPEED, min(MIN_SPEED, self.speed))
-        self.save_settings()
-        self.page.update()
+        self.settings.set('speed', speed_pct)
+        self.updates.update()
     
     def update_volume(self, e):
         """Update music volume based on slider value"""
         volume = e.control.value / 100  # Convert percentage to decimal (0-1)
         self.music.volume = volume
         self.music2.volume = volume
-        self.save_settings()
-    
-    def spawn_food(self):
-        """Spawn new food at random location"""
-        while True:
-            x = random.randint(0, GRID_SIZE - 1)
-            y = random.randint(0, GRID_SIZE - 1)
-            if (x, y) not in self.snake:
-                self.food = (x, y)
-                # 80% chance for special food
-                self.food_type = "special" if random.random() < 0.05 else "normal"
-                if self.food_type == "special":
-                    self.special_food_timer = 0  # Reset timer for special food
-                    # Random direction for special food
-                    self.food_direction = random.choice([(0, 1), (0, -1), (1, 0), (-1, 0)])
-                    self.last_food_move = 0
-                else:
-                    self.food_direction = (0, 0)
-                break
-    
-    def is_valid_direction(self, new_dir, current_dir):
-        return not (new_dir[0] == -current_dir[0] and new_dir[1] == -current_dir[1])
+        self.settings.set('volume', e.control.value)
     
     def toggle_pause(self):
         """Toggle game pause state"""
-        if not self.game_over:
-            self.paused = not self.paused
+        if not self.engine.game_over:
+            self.engine.set_paused(not self.paused)
             self.status_text.visible = self.paused
             self.speed_container.visible = self.paused
             self.pause_sound.play()
-            
-            # Pause/resume music based on game state
+            self.updates.update()
             if self.paused:
-                if self.food_type == "special":
-                    self.music2.pause()
-                else:
-                    self.music.pause()
-            else:
-                if self.food_type == "special":
-                    self.music2.resume()
-                else:
-                    self.music.resume()
-                    
-            self.page.update()
+                self.autosave()
+    
+    def toggle_autopilot(self):
+        """Switch between the autopilot and the keyboard, on the event loop"""
+        if self.autopilot is None:
+            self.autopilot = Autopilot(self.engine.grid_size)
+        self.autopilot.plan = []
+        self.autopilot_enabled = not self.autopilot_enabled
+        self.inputs.clear()
     
     def handle_keyboard_event(self, e: ft.KeyboardEvent):
         """Handle keyboard events for game control"""
         if e.key == "P":
             self.toggle_pause()
+        elif e.key == "H":
+            self.toggle_hud()
+        elif e.key == "O":
+            # Key handlers run in worker threads, the autopilot may be in choose() on the loop
+            self.loop.call_soon_threadsafe(self.toggle_autopilot)
         elif e.key == " ":  # Space key
-            if self.game_over:
-
+            if self.engine.game_over:
                 self.reset_game()
             else:
                 self.toggle_pause()
-        elif not self.paused and not self.game_over:
+        elif e.key in ARROW_DIRECTIONS and not self.paused and not self.engine.game_over:
             # Only handle direction changes if game is running
-            if e.key == "Arrow Left" and self.direction[0] != 1:
-                self.queued_direction = (-1, 0)
-            elif e.key == "Arrow Right" and self.direction[0] != -1:
-                self.queued_direction = (1, 0)
-            elif e.key == "Arrow Up" and self.direction[1] != 1:
-                self.queued_direction = (0, -1)
-            elif e.key == "Arrow Down" and self.direction[1] != -1:
-                self.queued_direction = (0, 1)
+            self.inputs.push(ARROW_DIRECTIONS[e.key], self.engine.direction)
     
     def reset_game(self):
-        if self.game_over:
-            # Update high scores before resetting
-            self.update_high_scores()
-        
-        self.snake = [(GRID_SIZE // 2, GRID_SIZE // 2)]
-        self.direction = (1, 0)
-        self.score = 0
-        self.game_over = False
-        self.food = None
-        self.food_type = "normal"
-        self.food_direction = (0, 0)
+        with self.updates.batch():
+            self._reset_game()
+    
+    def _reset_game(self):
+        self.engine.reset()
+        self.inputs.clear()
+        self.scheduler.set_active(True)
+        self.broadcaster.request_keyframe()
         self.running = True
-        self.paused = False
         
         # Reset game speed from saved settings
         speed_pct = self.speed_slider.value
@@ -419,251 +515,246 @@ class SnakeGame:
         self.status_text.visible = False
         self.speed_container.visible = False
         self.scores_card.visible = False
-        self.score_text.value = f"Score: {self.score}"
+        self.score_text.value = f"Score: {self.engine.score}"
         self.score_text.scale = 1
-        self.spawn_food()
+        self.renderer.reset(self.engine.snake)
+        self.start_recording()
         self.redraw_board()
-        self.page.update()
-    
-    def get_cell_position(self, grid_x, grid_y):
-        x = grid_x * (CELL_SIZE + CELL_SPACING)
-        y = grid_y * (CELL_SIZE + CELL_SPACING)
-        return x, y
-    
-    def move_special_food(self):
-        """Move special food in its current direction"""
-        if self.food_type == "special":
-            new_x = (self.food[0] + self.food_direction[0]) % GRID_SIZE
-            new_y = (self.food[1] + self.food_direction[1]) % GRID_SIZE
-            
-            # If new position collides with snake, reverse direction
-            if (new_x, new_y) in self.snake:
-                self.food_direction = (-self.food_direction[0], -self.food_direction[1])
-                new_x = (self.food[0] + self.food_direction[0]) % GRID_SIZE
-                new_y = (self.food[1] + self.food_direction[1]) % GRID_SIZE
-            
-            self.food = (new_x, new_y)
+        self.updates.update()
     
     async def game_loop(self):
         """Main game loop"""
         self.running = True
-        while self.running:
-            if not self.paused and not self.game_over:
-                # Update snake position
-                if self.queued_direction and self.is_valid_direction(self.queued_direction, self.direction):
-                    self.direction = self.queued_direction
-                    self.queued_direction = None
-                
-                # Move special food at half snake speed
-                if self.food_type == "special":
-                    self.last_food_move += self.speed
-                    if self.last_food_move >= self.speed * 2:  # Move at half speed
-                        self.move_special_food()
-                        self.last_food_move = 0
-                
-                # Calculate new head position
-                new_head = (
-                    (self.snake[0][0] + self.direction[0]) % GRID_SIZE,
-                    (self.snake[0][1] + self.direction[1]) % GRID_SIZE
-                )
-                
-                # Check for collision with self
-                if new_head in self.snake:
-                    self.game_over = True
-                    self.game_over_text.visible = True
-                    self.instructions.visible = True
-                    self.pause_sound.play()
-                    # Update and show high scores
-                    self.update_high_scores()
-                    self.scores_card.content.controls[2].controls[0].value = self.show_high_scores()
-                    self.scores_card.visible = True
-                    self.page.update()
-                    continue
-                
-                # Move snake
-                self.snake.insert(0, new_head)
-                
-                # Check for food collision
-                ate_food = False
-                if new_head == self.food:
-                    self.eat_food()
-                    ate_food = True
-                
-                if not ate_food:
-                    self.snake.pop()
-                
-                # Update special food timer
-                if self.food_type == "special":
-                    self.special_food_timer += self.speed
-                    if self.special_food_timer >= self.special_food_duration:
-                        self.spawn_food()  # Replace with new food
-                
-                # Clear and redraw board
-                self.redraw_board()
-            
-            # Wait before next frame
-            await asyncio.sleep(self.speed)
+        await self.scheduler.run(self.update, self.render)
     
-    def eat_food(self):
-        self.snake.append(self.food)
-        self.score += 10 if self.food_type == "normal" else 30
-        self.score_text.value = f"Score: {self.score}"
-        self.score_text.scale = 1.2
-        self.eat_sound.play()
-        self.page.update(self.score_text)
-        self.spawn_food()
+    def update(self, dt):
+        """Advance the game by one fixed step of dt real seconds"""
+        # Collect this tick's updates until render() flushes them
+        self.updates.begin()
+        if self.metrics.enabled:
+            start = time.perf_counter()
+            self.metrics.tick(start)
+            self.advance(dt)
+            self.metrics.add("logic", time.perf_counter() - start)
+        else:
+            self.advance(dt)
     
-    def redraw_board(self):
-        """Redraw the game board with current state"""
-        board_content = []
-        
-        # Draw grid
-        for y in range(GRID_SIZE):
-            for x in range(GRID_SIZE):
-                cell = ft.Container(
-                    width=CELL_SIZE,
-                    height=CELL_SIZE,
-                    left=x * (CELL_SIZE + CELL_SPACING),
-                    top=y * (CELL_SIZE + CELL_SPACING),
-                    bgcolor=BOARD_COLOR,
-                    border_radius=CELL_BORDER_RADIUS,
-                )
-                board_content.append(cell)
-        
-        # Draw food
-        if self.food:
-            if self.food_type == "special":
-                # Calculate opacity based on timer
-                opacity = max(0.3, 1 - (self.special_food_timer / self.special_food_duration))
-                food = ft.Container(
-                    width=CELL_SIZE,
-                    height=CELL_SIZE,
-                    left=self.food[0] * (CELL_SIZE + CELL_SPACING),
-                    top=self.food[1] * (CELL_SIZE + CELL_SPACING),
-                    bgcolor=SPECIAL_FOOD_COLOR,
-                    border_radius=CELL_BORDER_RADIUS,
-                    border=ft.border.all(2, SPECIAL_FOOD_OUTLINE_COLOR),
-                    opacity=opacity,
-                    animate=FOOD_ANIMATION,
-                )
+    def advance(self, dt):
+        if not self.paused and not self.engine.game_over:
+            if self.autopilot_enabled:
+                direction = self.autopilot.choose(self.engine)
             else:
-                food = ft.Container(
-                    width=CELL_SIZE,
-                    height=CELL_SIZE,
-                    left=self.food[0] * (CELL_SIZE + CELL_SPACING),
-                    top=self.food[1] * (CELL_SIZE + CELL_SPACING),
-                    bgcolor=FOOD_COLOR,
-                    border_radius=CELL_BORDER_RADIUS,
-                    border=FOOD_BORDER,
-                    animate=FOOD_ANIMATION,
-                )
-            board_content.append(food)
-        
-        # Draw snake
-        for i, pos in enumerate(self.snake):
-            is_head = i == 0
-            snake_part = ft.Container(
-                width=CELL_SIZE,
-                height=CELL_SIZE,
-                left=pos[0] * (CELL_SIZE + CELL_SPACING),
-                top=pos[1] * (CELL_SIZE + CELL_SPACING),
-                bgcolor=SNAKE_COLORS["head"] if is_head else SNAKE_COLORS["body"],
-                border_radius=CELL_BORDER_RADIUS,
-                border=SNAKE_HEAD_BORDER if is_head else SNAKE_BODY_BORDER,
-                animate=SNAKE_HEAD_ANIMATION if is_head else SNAKE_BODY_ANIMATION,
-            )
-            board_content.append(snake_part)
-        
-        # Update board
-        self.board.content.controls = board_content
-        self.page.update()
+                direction = self.inputs.pop()
+            if self.recorder:
+                self.recorder.record(direction, dt)
+            self.engine.step(direction, dt)
+            self.broadcaster.end_tick()
+            if self.engine.elapsed - self.last_autosave >= AUTOSAVE_INTERVAL:
+                self.autosave()
+    
+    def start_recording(self):
+        """Record the game that is about to start"""
+        if self.recorder:
+            self.recorder.finish()
+            self.recorder = None
+        if not self.replays_dir:
+            return
+        name = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{self.engine.seed}.snkr"
+        self.recorder = ReplayRecorder(os.path.join(self.replays_dir, name), self.engine)
+    
+    def autosave(self):
+        """Snapshot the running game; from the event loop the file is written by a worker thread.
 
-    def load_high_scores(self):
-        """Load high scores from file"""
+        Handlers running in worker threads hand the snapshot over to the loop,
+        so it never reads the engine in the middle of a step.
+        """
+        if self.engine.game_over or not self.autosave_file:
+            return
         try:
-            if os.path.exists(self.high_scores_file):
-                with open(self.high_scores_file, 'r') as f:
-                    return json.load(f)
-            return []
-        except Exception as e:
-            print(f"Error loading high scores: {e}")
-            return []
-
-    def save_high_scores(self):
-        """Save high scores to file"""
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None  # Input handler thread or shutdown
+            try:
+                self.loop.call_soon_threadsafe(self.autosave)
+                return
+            except RuntimeError:
+                pass  # The loop is closed, nothing steps the engine any more
+        self.last_autosave = self.engine.elapsed
+        with self.autosave_lock:
+            self.autosave_count += 1
+            number = self.autosave_count
+        data = snapshot.dumps(self.engine, self.inputs.queued())
+        if loop and sys.platform != "emscripten":
+            loop.run_in_executor(None, self.write_autosave, number, data)
+        else:
+            self.write_autosave(number, data)
+    
+    def write_autosave(self, number, data):
+        with self.autosave_lock:
+            # Never overwrite a newer snapshot with an older one
+            if number <= self.autosave_written:
+                return
+            try:
+                snapshot.write(self.autosave_file, data)
+                self.autosave_written = number
+            except Exception as e:
+                print(f"Error saving game: {e}")
+    
+    def remove_autosave(self):
+        with self.autosave_lock:
+            # Snapshots still in flight are older than the game over
+            self.autosave_written = self.autosave_count
+            try:
+                if self.autosave_file and os.path.exists(self.autosave_file):
+                    os.remove(self.autosave_file)
+            except Exception as e:
+                print(f"Error removing saved game: {e}")
+    
+    def restore_autosave(self):
+        """Load the autosaved game, paused; returns whether there was one"""
         try:
-            with open(self.high_scores_file, 'w') as f:
-                json.dump(self.high_scores, f)
+            if not self.autosave_file or not os.path.exists(self.autosave_file):
+                return False
+            with open(self.autosave_file, "rb") as f:
+                queued = snapshot.restore(self.engine, f.read())
         except Exception as e:
-            print(f"Error saving high scores: {e}")
-
-    def load_settings(self):
-        """Load saved settings"""
-        try:
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r') as f:
-                    settings = json.load(f)
-                    self.saved_speed_value = settings.get('speed', 50)
-                    self.saved_volume_value = settings.get('volume', 50)
+            print(f"Error loading saved game: {e}")
+            return False
+        self.engine.paused = True
+        self.speed = self.engine.speed
+        for direction in queued:
+            self.inputs.push(direction, self.engine.direction)
+        return True
+    
+    def on_engine_event(self, kind, data):
+        """Reflect engine events in the UI"""
+        if kind == MOVED:
+            self.renderer.move_snake(*data)
+        elif kind == ATE:
+            self.eat_food()
+        elif kind == GAME_OVER:
+            self.scheduler.set_active(False)
+            self.show_game_over()
+        elif kind == PAUSED:
+            # Nothing to tick while paused
+            self.scheduler.set_active(False)
+        elif kind == RESUMED:
+            self.scheduler.set_active(True)
+    
+    def eat_food(self):
+        self.score_text.value = f"Score: {self.engine.score}"
+        self.score_text.scale = 1.2
+        self.eat_sound.play()
+        self.updates.update(self.score_text)
+    
+    def show_game_over(self):
+        if self.recorder:
+            self.recorder.finish()
+        self.remove_autosave()
+        self.game_over_text.value = "You Win!" if self.engine.won else "Game Over!"
+        self.game_over_text.visible = True
+        self.instructions.visible = True
+        self.pause_sound.play()
+        # Update and show high scores
+        self.update_high_scores()
+        self.scores_card.content.controls[2].controls[0].value = self.show_high_scores()
+        self.scores_card.visible = True
+        self.updates.update()
+    
+    def redraw_board(self):
+        """Push the changes of the current tick to the board"""
+        engine = self.engine
+        opacity = 1
+        if engine.food_type == "special":
+            # Calculate opacity based on timer
+            opacity = max(0.3, 1 - (engine.special_food_timer / engine.special_food_duration))
+        self.renderer.draw_food(engine.food, engine.food_type, opacity)
+        self.renderer.flush()
+    
+    def render(self):
+        """Draw the frame and send all of this tick's updates in one round-trip"""
+        if self.metrics.enabled:
+            self.render_measured()
+        else:
+            self.redraw_board()
+            self.updates.flush()
+        self.inputs.rendered()
+        if "first board" not in self.startup.marks:
+            self.startup.mark("first board")
+            self.report_startup()
+    
+    def render_measured(self):
+        """render() with each phase timed for the metrics"""
+        metrics = self.metrics
+        start = time.perf_counter()
+        self.redraw_board()
+        drawn = time.perf_counter()
+        metrics.add("draw", drawn - start)
+        metrics.set("target_tick_rate", 1 / self.speed)
+        metrics.set("snake_length", len(self.engine.snake))
+        metrics.set("score", self.engine.score)
+        if self.hud_container.visible and drawn >= self.hud_next_refresh:
+            self.hud_next_refresh = drawn + HUD_REFRESH_INTERVAL
+            self.refresh_hud()
+        flush_start = time.perf_counter()
+        self.updates.flush()
+        now = time.perf_counter()
+        metrics.add("update", now - flush_start)
+        metrics.frame(self.updates.last_size)
+        if self.metrics_file and now >= self.metrics_next_write:
+            self.metrics_next_write = now + METRICS_INTERVAL
+            if sys.platform == "emscripten":
+                metrics.write(self.metrics_file)
             else:
-                self.saved_speed_value = 50
-                self.saved_volume_value = 50
-                self.save_settings()
-        except Exception as e:
-            print(f"Error loading settings: {e}")
-            self.saved_speed_value = 50
-            self.saved_volume_value = 50
-
-    def save_settings(self):
-        """Save current settings"""
-        try:
-            settings = {
-                'speed': self.speed_slider.value,
-                'volume': self.volume_slider.value
-            }
-            with open(self.settings_file, 'w') as f:
-                json.dump(settings, f)
-        except Exception as e:
-            print(f"Error saving settings: {e}")
+                asyncio.get_running_loop().run_in_executor(None, metrics.write, self.metrics_file)
+    
+    def refresh_hud(self):
+        m = self.metrics.summary()
+        self.hud.value = (
+            f"ticks/s  {m['tick_rate']:6.1f} / {m['target_tick_rate']:.1f}\n"
+            f"logic    {m['logic_mean'] * 1000:6.2f} ms  max {m['logic_max'] * 1000:6.2f}\n"
+            f"draw     {m['draw_mean'] * 1000:6.2f} ms  max {m['draw_max'] * 1000:6.2f}\n"
+            f"update   {m['update_mean'] * 1000:6.2f} ms  max {m['update_max'] * 1000:6.2f}\n"
+            f"late     {m.get('scheduler_mean_lateness', 0) * 1000:6.2f} ms  max {m.get('scheduler_max_lateness', 0) * 1000:6.2f}\n"
+            f"input    {m['input_mean_latency'] * 1000:6.2f} ms  max {m['input_max_latency'] * 1000:6.2f}\n"
+            f"controls {m['controls_per_frame']:6.1f} / frame\n"
+            f"length   {m['snake_length']:6d}"
+        )
+        self.updates.update(self.hud)
+    
+    def toggle_hud(self):
+        """Show or hide the performance overlay; metrics are only measured while needed"""
+        self.hud_container.visible = not self.hud_container.visible
+        self.metrics.enabled = self.hud_container.visible or bool(self.metrics_file)
+        self.metrics.reset()
+        self.hud_next_refresh = 0
+        self.updates.update(self.hud_container)
+    
+    def on_music_loaded(self, e):
+        self.startup.mark("music loaded")
+        self.report_startup()
+    
+    def report_startup(self):
+        """Print the time to the first playable frame once the music is ready too"""
+        self.startup.write()
+        marks = self.startup.marks
+        if self.startup.reported or "first board" not in marks or "music loaded" not in marks:
+            return
+        self.startup.reported = True
+        print(
+            f"First playable frame after {marks['first board'] * 1000:.0f} ms, "
+            f"music playable after {marks['music loaded'] * 1000:.0f} ms"
+        )
 
     def update_high_scores(self):
-        """Update the high scores list with the current score"""
-        if self.score > 0:  # Only add scores greater than 0
-            # Check if this exact score already exists
-            current_time = datetime.now().strftime('%Y-%m-%d %H:%M')
-            new_score = {
-                'score': self.score,
-                'date': current_time
-            }
-            
-            # Check if this score was just added (avoid duplicates)
-            score_exists = any(
-                score['score'] == self.score and 
-                score['date'] == current_time 
-                for score in self.high_scores
-            )
-            
-            if not score_exists:
-                # Add new score
-                self.high_scores.append(new_score)
-                
-                # Sort scores in descending order
-                self.high_scores.sort(key=lambda x: x['score'], reverse=True)
-                
-                # Keep only top 10 scores
-                self.high_scores = self.high_scores[:10]
-                
-                # Save to file
-                self.save_high_scores()
-            
-            # Update displayed high score
-            self.high_score_text.value = f"High Score: {self.get_highest_score()}"
-            self.page.update()
+        """Record the finished game and refresh the high score"""
+        engine = self.engine
+        self.scores.add(engine.score, len(engine.snake), round(engine.elapsed, 2), self.speed)
+        self.high_score_text.value = f"High Score: {self.get_highest_score()}"
+        self.updates.update()
 
     def get_highest_score(self):
-        if not self.high_scores:
-            return 0
-        return self.high_scores[0]['score']
+        return self.scores.personal_best()
 
     def toggle_scores_card(self):
         self.show_scores_card = not self.show_scores_card
@@ -671,14 +762,15 @@ class SnakeGame:
         if self.show_scores_card:
             # Update scores when showing card
             self.scores_card.content.controls[2].controls[0].value = self.show_high_scores()
-        self.page.update()
+        self.updates.update()
 
     def show_high_scores(self):
-        if not self.high_scores:
+        high_scores = self.scores.top_scores(10)
+        if not high_scores:
             return "No high scores yet!"
         
         scores_text = ""
-        for i, score in enumerate(self.high_scores, 1):
+        for i, score in enumerate(high_scores, 1):
             date = score['date']
             points = score['score']
             if i == 1:
@@ -691,23 +783,122 @@ class SnakeGame:
                 scores_text += f"{i}. {points} pts ({date})\n"
         return scores_text
 
-    async def loop_background_music(self):
-        current_music = "normal"
-        while True:
-            if not self.paused and not self.game_over:
-                if self.food_type == "special" and current_music != "special":
-                    self.music.pause()
-                    self.music2.resume()
-                    current_music = "special"
-                elif self.food_type == "normal" and current_music != "normal":
-                    self.music2.pause()
-                    self.music.resume()
-                    current_music = "normal"
-            await asyncio.sleep(0.1)
+    def close(self):
+        """Stop the game loop and background music, save pending settings"""
+        self.running = False
+        self.scheduler.stop()
+        self.music_controller.close()
+        self.broadcaster.close()
+        if self.recorder:
+            self.recorder.finish()
+        self.autosave()
+        self.settings.flush()
+        if self.owns_scores:
+            self.scores.close()
 
 async def main(page: ft.Page):
     game = SnakeGame(page)
     await game.game_loop()
 
+async def spectate(page: ft.Page, game):
+    """Read-only view of another player's game"""
+    page.title = "Snake Game Flet - Spectating"
+    page.bgcolor = BACKGROUND_COLOR
+    if game is None:
+        page.add(ft.Text("No game to watch", **TITLE_STYLE))
+        return
+    updates = UpdateBatcher(page)
+    renderer = create_renderer(updates)
+    score_text = ft.Text("Score: 0", **SCORE_STYLE)
+    page.add(
+        ft.Column(
+            [
+                score_text,
+                ft.Container(
+                    content=renderer.control,
+                    width=BOARD_SIZE,
+                    height=BOARD_SIZE,
+                    bgcolor=BACKGROUND_COLOR,
+                    border_radius=BOARD_BORDER_RADIUS,
+                    padding=BOARD_PADDING,
+                ),
+            ],
+            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+        )
+    )
+    
+    def on_frame(state):
+        text = f"Score: {state.score}"
+        if text != score_text.value:
+            score_text.value = text
+            updates.update(score_text)
+    
+    # Stop watching when the spectator leaves
+    loop = asyncio.get_running_loop()
+    task = asyncio.current_task()
+    page.on_close = lambda _: loop.call_soon_threadsafe(task.cancel)
+    try:
+        await watch(game.broadcaster, renderer, updates, on_frame)
+    except asyncio.CancelledError:
+        pass
+
+def serve(argv):
+    """Host many players from one process with a shared scheduler"""
+    import argparse
+    parser = argparse.ArgumentParser(prog="main.py serve")
+    parser.add_argument("--port", type=int, default=8550)
+    parser.add_argument("--stats-interval", type=float, default=60, help="seconds between stats lines, 0 to disable")
+    parser.add_argument("--record-replays", action="store_true", help="save a replay of every game")
+    args = parser.parse_args(argv)
+    server = SessionScheduler()
+    # One database for all players, opened before the first session
+    data_dir = app_data_dir()
+    scores = ScoreStore(
+        os.path.join(data_dir, "scores.db"),
+        legacy_json=os.path.join(data_dir, "high_scores.json"),
+    )
+    reporting = []
+    games = {}  # Running games by number, for spectators
+    
+    async def session_main(page: ft.Page):
+        if args.stats_interval and not reporting:
+            reporting.append(asyncio.create_task(server.report(args.stats_interval)))
+        if page.route.startswith("/watch"):
+            # /watch/<number>, or /watch for the newest game
+            number = page.route.rstrip("/").rsplit("/", 1)[-1]
+            if not number.isdigit():
+                number = max(games, default=0)
+            await spectate(page, games.get(int(number)))
+            return
+        # Players get their own settings in memory instead of sharing settings.json
+        game = SnakeGame(
+            page,
+            scheduler=server.session(DEFAULT_SPEED),
+            autosave=False,
+            scores=scores,
+            settings=SettingsStore(None, DEFAULT_SETTINGS),
+            record=args.record_replays,
+        )
+        number = max(games, default=0) + 1
+        games[number] = game
+        print(f"Game {number} started, watch it at /watch/{number}")
+        try:
+            await game.game_loop()
+        finally:
+            del games[number]
+    
+    try:
+        ft.app(target=session_main, view=None, port=args.port, assets_dir="assets")
+    finally:
+        scores.close()
+
 if __name__ == "__main__":
+    if sys.argv[1:2] == ["sweep"]:
+        from game.sweep import main as sweep
+        sys.exit(sweep(sys.argv[2:]))
+    if sys.argv[1:2] == ["serve"]:
+        serve(sys.argv[2:])
+        sys.exit()
+    if "--startup-trace" in sys.argv[1:-1]:
+        startup.path = sys.argv[sys.argv.index("--startup-trace") + 1]
     ft.app(target=main , assets_dir="assets")